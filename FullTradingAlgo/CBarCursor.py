@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class CBarCursor:
+    """
+    Curseur léger sur les bougies d'un symbole.
+
+    Les colonnes sont extraites en tableaux NumPy à la première lecture puis
+    mises en cache ; le moteur déplace ensuite le curseur (`i`, `name`) au lieu
+    de construire une pd.Series par bougie comme le fait `iterrows()`.
+
+    - Accès à la bougie courante : row["col"], row.get("col", défaut), row.name
+    - Accès positionnel (lookback) : cursor.column("col")[i - 10], cursor.at("col", j)
+    """
+
+    __slots__ = ("symbol", "i", "name", "_df", "_columns")
+
+    def __init__(self, df, symbol):
+        self.symbol = symbol
+        self.i = -1
+        self.name = None
+        self._df = df
+        self._columns = {}
+
+    def move(self, i, timestamp):
+        self.i = i
+        self.name = timestamp
+
+    def column(self, col):
+        """Retourne le tableau NumPy complet de la colonne (None si absente)."""
+        try:
+            return self._columns[col]
+        except KeyError:
+            pass
+        if col in self._df.columns:
+            values = self._df[col].to_numpy()
+        elif col == "symbol":
+            values = np.full(len(self._df), self.symbol, dtype=object)
+        else:
+            values = None
+        self._columns[col] = values
+        return values
+
+    def at(self, col, i):
+        return self.column(col)[i]
+
+    def __getitem__(self, col):
+        values = self.column(col)
+        if values is None:
+            raise KeyError(col)
+        return values[self.i]
+
+    def __contains__(self, col):
+        return self.column(col) is not None
+
+    def get(self, col, default=None):
+        values = self.column(col)
+        if values is None:
+            return default
+        return values[self.i]
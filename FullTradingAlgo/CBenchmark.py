@@ -0,0 +1,288 @@
+import gc
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "indicators")))
+
+from CSyntheticCandles import CSyntheticCandles
+
+MINUTES_PER_DAY = 24 * 60
+
+# Tailles de séries 1m (1 jour -> 7 mois)
+SIZES = {
+    "1d": MINUTES_PER_DAY,
+    "1w": 7 * MINUTES_PER_DAY,
+    "1m": 30 * MINUTES_PER_DAY,
+    "3m": 91 * MINUTES_PER_DAY,
+    "7m": 213 * MINUTES_PER_DAY,
+}
+
+# RSI 4h période 14 : 56 h de bougies avant la première valeur, la stratégie n'a rien à faire avant
+BACKTEST_MIN_MINUTES = 3 * MINUTES_PER_DAY
+
+PROFILES = {
+    "quick": {"sizes": ["1d", "1w"], "symbols": [1]},
+    "standard": {"sizes": ["1d", "1w", "1m"], "symbols": [1, 10]},
+    "full": {"sizes": list(SIZES), "symbols": [1, 10, 100]},
+}
+
+# (module dans strategies/, classe) des stratégies qui fournissent apply_indicators
+STRATEGIES = [
+    ("CStrat_RSI5min30", "CStrat_RSI5min30"),
+    ("CStrat_RSI5min30_rate", "CStrat_RSI5min30"),
+    ("CStrat_4h_HA", "CStrat_4h_HA"),
+    ("CStrat_PatternsJDU", "CStrat_PatternsJDU"),
+    ("CStrat_TestBreakout", "CStrat_TestBreakout"),
+    ("CStrat_WDetector", "CStrat_WDetector"),
+]
+
+
+def _rsi_4h(df):
+    import CRSICalculator
+    return CRSICalculator.CRSICalculator(df, period=14, close_times=[(h, 0) for h in range(0, 24, 4)],
+                                         name="rsi_4h_14").get_df()
+
+
+def _rsi_5m(df):
+    import CRSICalculator
+    return CRSICalculator.CRSICalculator(df, period=14,
+                                         close_times=[(h, m) for h in range(24) for m in range(0, 60, 5)],
+                                         name="rsi_5m_14").get_df()
+
+
+def _rsi_multi(df):
+    import CMultiRSICalculator
+    return CMultiRSICalculator.CMultiRSICalculator(df, [("4h", 14, "rsi_4h_14"), ("5min", 14, "rsi_5m_14")]).get_df()
+
+
+def _morning_star(df):
+    import CJapanesePatternDetector
+    return CJapanesePatternDetector.CJapanesePatternDetector("CDLMORNINGSTAR", timeframe="5min",
+                                                             pct_threshold=0.3).detect_and_filter(df.copy())
+
+
+def _hammer(df):
+    import CJapanesePatternDetector
+    return CJapanesePatternDetector.CJapanesePatternDetector("CDLHAMMER", timeframe="5min",
+                                                             pct_threshold=0.3).detect_and_filter(df.copy())
+
+
+def _patterns_multi(df):
+    import CMultiPatternDetector
+    return CMultiPatternDetector.CMultiPatternDetector([
+        ("CDLMORNINGSTAR", "5min", 0.3, "morning_star_5m"),
+        ("CDLHAMMER", "5min", 0.3, "hammer_5m"),
+        ("CDLHAMMER", "1h", 0.3, "hammer_1h"),
+    ]).detect_and_filter(df)
+
+
+def _trend_break(df):
+    import CTrendBreakDetector
+    return CTrendBreakDetector.CTrendBreakDetector().detect_breaks(df, window=20, alpha=0.05)
+
+
+def _peaks(df):
+    import CPeaksDetector
+    return CPeaksDetector.CPeaksDetector(df, atr_period=1000, factor=0.7, distance=30).get_df()
+
+
+INDICATORS = {
+    "CRSICalculator_4h": _rsi_4h,
+    "CRSICalculator_5m": _rsi_5m,
+    "CMultiRSICalculator_4h_5m": _rsi_multi,
+    "CJapanesePatternDetector_MorningStar": _morning_star,
+    "CJapanesePatternDetector_Hammer": _hammer,
+    "CMultiPatternDetector_3": _patterns_multi,
+    "CTrendBreakDetector": _trend_break,
+    "CPeaksDetector": _peaks,
+}
+
+
+class CBenchmark:
+    """
+    Banc de mesure hors ligne (aucun accès Binance) sur bougies synthétiques déterministes :
+
+    - chaque indicateur de indicators/ sur un symbole, pour chaque taille
+    - `apply_indicators` de chaque stratégie, sur 1 à N symboles
+    - un backtest complet CTradingAlgo (RSI5min30), indicateurs précalculés hors mesure
+
+    Pour chaque cas : temps (meilleur de `repeat`), débit en bougies/s et pic mémoire Python
+    (tracemalloc, mesuré sur une exécution séparée pour ne pas fausser le temps).
+    Les résultats peuvent être comparés à un fichier de référence JSON (`baseline`).
+    Un cas dont le module ne s'importe pas (ex: talib absent) est marqué "skipped".
+    """
+
+    def __init__(self, profile="quick", sizes=None, symbols=None, repeat=1, measure_memory=True,
+                 seed=42, cases=("indicators", "strategies", "backtest")):
+        if profile not in PROFILES:
+            raise ValueError(f"Profil inconnu : {profile}")
+        self.sizes = sizes or PROFILES[profile]["sizes"]
+        self.symbols = symbols or PROFILES[profile]["symbols"]
+        unknown = [s for s in self.sizes if s not in SIZES]
+        if unknown:
+            raise ValueError(f"Tailles inconnues : {unknown}")
+        self.repeat = repeat
+        self.measure_memory = measure_memory
+        self.cases = cases
+        self.generator = CSyntheticCandles(seed=seed)
+        self.results = []
+
+    # ------------------------------------------------------------ mesures
+
+    def _measure(self, case, size, n_symbols, rows, fn):
+        record = {"case": case, "size": size, "symbols": n_symbols, "rows": rows}
+        try:
+            peak = None
+            if self.measure_memory:
+                gc.collect()
+                tracemalloc.start()
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            best = None
+            for _ in range(self.repeat):
+                gc.collect()
+                t0 = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+        except ImportError as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            record["status"] = f"skipped: {e}"
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            record["status"] = f"error: {type(e).__name__}: {e}"
+        else:
+            record.update({
+                "status": "ok",
+                "time_s": best,
+                "rows_per_s": rows / best if best else float("inf"),
+                "peak_mb": peak / 2 ** 20 if peak is not None else None,
+            })
+
+        self.results.append(record)
+        self._print_record(record)
+        return record
+
+    @staticmethod
+    def _print_record(r):
+        label = f"{r['case']:<45} {r['size']:>3} x{r['symbols']:<3}"
+        if r["status"] != "ok":
+            print(f"⚠️ {label} {r['status']}")
+            return
+        mem = f"{r['peak_mb']:8.1f} Mo" if r["peak_mb"] is not None else ""
+        print(f"✅ {label} {r['time_s']:9.3f} s {r['rows_per_s']:12.0f} bougies/s {mem}")
+
+    # --------------------------------------------------------------- cas
+
+    def _bench_indicators(self, size):
+        df = self.generator.generate(SIZES[size])
+        for name, fn in INDICATORS.items():
+            self._measure(f"indicator/{name}", size, 1, len(df), lambda: fn(df))
+
+    def _bench_strategies(self, size, list_data):
+        rows = sum(len(df) for df, _ in list_data)
+        for module_name, class_name in STRATEGIES:
+            def run():
+                module = importlib.import_module(f"strategies.{module_name}")
+                strategy = getattr(module, class_name)(None)
+                # is_btc_file=True : pas d'ajout des colonnes BTC (fichier réel non disponible)
+                for df, _ in list_data:
+                    strategy.apply_indicators(df, is_btc_file=True)
+            self._measure(f"apply_indicators/{module_name}", size, len(list_data), rows, run)
+
+    def _bench_backtest(self, size, list_data):
+        if SIZES[size] < BACKTEST_MIN_MINUTES:
+            record = {"case": "backtest/RSI5min30", "size": size, "symbols": len(list_data), "rows": 0,
+                      "status": "skipped: série trop courte pour le RSI 4h"}
+            self.results.append(record)
+            self._print_record(record)
+            return
+
+        import CEvaluateROI
+        import CTradingAlgo
+        from strategies.CStrat_RSI5min30 import CStrat_RSI5min30
+
+        strategy = CStrat_RSI5min30(None)
+        prepared = [(strategy.apply_indicators(df, is_btc_file=True), symbol) for df, symbol in list_data]
+        rows = sum(len(df) for df, _ in prepared)
+
+        def run():
+            evaluator = CEvaluateROI.CEvaluateROI(1000, trading_fee_rate=0.001)
+            # CInterfaceTrades ne fait que relayer vers l'évaluateur et importe ccxt (CBitgetTrader) :
+            # on passe l'évaluateur directement pour rester hors ligne
+            algo = CTradingAlgo.CTradingAlgo(evaluator,
+                                             risk_per_trade_pct=0.1, strategy_name="RSI5min30",
+                                             show_progress=False)
+            algo.run(prepared, execution=False, save_results=False)
+
+        self._measure("backtest/RSI5min30", size, len(list_data), rows, run)
+
+    def run(self):
+        self.results = []
+        for size in self.sizes:
+            if "indicators" in self.cases:
+                self._bench_indicators(size)
+            for n_symbols in self.symbols:
+                list_data = self.generator.generate_symbols(SIZES[size], n_symbols)
+                if "strategies" in self.cases:
+                    self._bench_strategies(size, list_data)
+                if "backtest" in self.cases:
+                    self._bench_backtest(size, list_data)
+        return self.results
+
+    # ------------------------------------------------------------ référence
+
+    @staticmethod
+    def _key(record):
+        return f"{record['case']}|{record['size']}|{record['symbols']}"
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.results)
+
+    def save_baseline(self, path):
+        baseline = {
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "machine": platform.machine(),
+            },
+            "results": {self._key(r): r for r in self.results if r["status"] == "ok"},
+        }
+        with open(path, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"✅ Référence sauvegardée : {path}")
+
+    def compare(self, path, tolerance=0.25):
+        """
+        Compare aux temps de référence. Retourne la liste des régressions
+        (temps > référence * (1 + tolerance)) et affiche le ratio de chaque cas.
+        """
+        with open(path) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = []
+        print("\n📊 Comparaison à la référence")
+        print("=" * 40)
+        for r in self.results:
+            ref = baseline.get(self._key(r))
+            if r["status"] != "ok" or ref is None:
+                continue
+            ratio = r["time_s"] / ref["time_s"] if ref["time_s"] else float("inf")
+            flag = "❌" if ratio > 1 + tolerance else "✅"
+            print(f"{flag} {self._key(r):<60} x{ratio:.2f} ({ref['time_s']:.3f} s -> {r['time_s']:.3f} s)")
+            if ratio > 1 + tolerance:
+                regressions.append({**r, "baseline_time_s": ref["time_s"], "ratio": ratio})
+        return regressions
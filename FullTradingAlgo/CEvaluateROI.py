@@ -1,17 +1,53 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from CPositionBook import CPosition, CPositionBook
+from CEventLog import CEventLog, WARNING
+
 
 class CEvaluateROI:
-    def __init__(self, initial_usdc=1000.0, trading_fee_rate=0.001):
+    def __init__(self, initial_usdc=1000.0, trading_fee_rate=0.001, event_log=None):
         self.initial_usdc = initial_usdc
         self.available_usdc = initial_usdc
         self.trading_fee_rate = trading_fee_rate
 
         self.trades = []  # Liste brute de tous les ordres (entrée + sortie)
-        self.positions = {}  # Positions ouvertes {asset: position_dict}
+        self.positions = CPositionBook()  # Positions ouvertes (une seule par actif ici)
         self.closed_trades = []  # Positions fermées avec pnl et timestamps
         self.latest_prices = {}  # Derniers prix par actif
+        # Avertissements (trade ignoré, position introuvable...) : journal au lieu de print
+        self.event_log = event_log if event_log is not None else CEventLog()
+
+    @classmethod
+    def merge(cls, evaluators):
+        """
+        Fusionne les évaluateurs de plusieurs backtests indépendants (un par groupe de symboles).
+
+        Chaque évaluateur a simulé ses symboles avec sa propre part du capital ; le capital
+        initial et le disponible fusionnés sont leurs sommes. Les ordres et trades fermés sont
+        triés de façon stable par date, à égalité dans l'ordre de `evaluators` : le résultat
+        est déterministe quel que soit l'ordre de fin des processus.
+        """
+        if not evaluators:
+            raise ValueError("Aucun évaluateur à fusionner")
+
+        merged = cls(initial_usdc=sum(e.initial_usdc for e in evaluators),
+                     trading_fee_rate=evaluators[0].trading_fee_rate)
+        merged.available_usdc = sum(e.available_usdc for e in evaluators)
+
+        for e in evaluators:
+            for pos in e.positions:
+                if pos.symbol in merged.positions:
+                    raise ValueError(f"Position sur {pos.symbol} présente dans plusieurs évaluateurs")
+                merged.positions.add(pos)
+            merged.latest_prices.update(e.latest_prices)
+            merged.trades.extend(e.trades)
+            merged.closed_trades.extend(e.closed_trades)
+            merged.event_log.extend(e.event_log)
+
+        merged.trades.sort(key=lambda t: t["timestamp"])
+        merged.closed_trades.sort(key=lambda t: t["exit_time"])
+        return merged
 
     def get_available_usdc(self):
         return self.available_usdc
@@ -40,36 +76,36 @@ class CEvaluateROI:
         if side in ["BUY_LONG", "SELL_SHORT"]:
             if asset in self.positions:
                 # Position déjà ouverte sur cet actif, on ne peut pas en ouvrir une autre
-                print(f"⚠️ Position déjà ouverte sur {asset}, trade ignoré : {side} à {timestamp}")
+                self.event_log.warning(timestamp, asset, f"Position déjà ouverte, trade ignoré : {side}")
                 return
 
             fee = amount_usdc * self.trading_fee_rate
             net_amount = amount_usdc - fee
 
             if self.available_usdc < amount_usdc:
-                print(f"⚠️ Pas assez d'USDC disponible pour ouvrir position sur {asset}")
+                self.event_log.warning(timestamp, asset, "Pas assez d'USDC disponible pour ouvrir la position")
                 return
 
             self.available_usdc -= amount_usdc  # bloque le montant brut
 
-            self.positions[asset] = {
-                "side": side,
-                "entry_price": price,
-                "usdc": net_amount,
-                "timestamp": timestamp,
-                "asset": asset
-            }
+            self.positions.add(CPosition(
+                symbol=asset,
+                side=side,
+                entry_price=price,
+                usdc=net_amount,
+                opened_on=timestamp
+            ))
 
         # Fermeture de position
         elif side in ["SELL_LONG", "BUY_SHORT"]:
             pos = self.positions.get(asset)
             if pos is None:
-                print(f"⚠️ Aucune position ouverte sur {asset} pour fermer à {timestamp}")
+                self.event_log.warning(timestamp, asset, "Aucune position ouverte à fermer")
                 return
 
-            entry_price = pos["entry_price"]
-            entry_usdc = pos["usdc"]
-            entry_side = pos["side"]
+            entry_price = pos.entry_price
+            entry_usdc = pos.usdc
+            entry_side = pos.side
 
             fee = entry_usdc * self.trading_fee_rate
 
@@ -78,7 +114,7 @@ class CEvaluateROI:
             elif entry_side == "SELL_SHORT" and side == "BUY_SHORT":
                 pnl = entry_usdc * (entry_price / price - 1)
             else:
-                print(f"⚠️ Incohérence sens entrée/sortie sur {asset} à {timestamp}")
+                self.event_log.warning(timestamp, asset, f"Incohérence sens entrée/sortie : {entry_side} / {side}")
                 return
 
             self.available_usdc += entry_usdc + pnl - fee
@@ -87,25 +123,25 @@ class CEvaluateROI:
                 "side": entry_side,
                 "entry_price": entry_price,
                 "exit_price": price,
-                "entry_time": pos["timestamp"],
+                "entry_time": pos.opened_on,
                 "exit_time": timestamp,
                 "usdc": entry_usdc,
                 "pnl": pnl,
                 "fee": fee,
-                "duration": (timestamp - pos["timestamp"]).total_seconds()
+                "duration": (timestamp - pos.opened_on).total_seconds()
             })
 
-            del self.positions[asset]
+            self.positions.remove(pos)
 
     def get_final_balance(self):
         balance = self.available_usdc
-        for asset, pos in self.positions.items():
-            current_price = self.latest_prices.get(asset)
+        for pos in self.positions:
+            current_price = self.latest_prices.get(pos.symbol)
             if current_price is None:
                 continue
-            entry_price = pos["entry_price"]
-            usdc = pos["usdc"]
-            side = pos["side"]
+            entry_price = pos.entry_price
+            usdc = pos.usdc
+            side = pos.side
             if side == "BUY_LONG":
                 gain = current_price / entry_price
             elif side == "SELL_SHORT":
@@ -118,6 +154,18 @@ class CEvaluateROI:
     def get_roi_percentage(self):
         return ((self.get_final_balance() - self.initial_usdc) / self.initial_usdc) * 100
 
+    def get_max_drawdown(self):
+        """
+        Drawdown maximal (en %) de la courbe de capital réalisé, reconstruite à partir
+        des trades fermés (pnl - frais) dans l'ordre de sortie.
+        """
+        if not self.closed_trades:
+            return 0.0
+        df = pd.DataFrame(self.closed_trades).sort_values("exit_time", kind="mergesort")
+        capital = self.initial_usdc + (df["pnl"] - df["fee"]).cumsum()
+        peak = capital.cummax().clip(lower=self.initial_usdc)
+        return float(((peak - capital) / peak).max() * 100)
+
     def plot_combined(self):
         if not self.closed_trades:
             print("⚠️ Aucun trade fermé à afficher")
@@ -158,6 +206,9 @@ class CEvaluateROI:
         losses = sum(1 for t in self.closed_trades if t["pnl"] <= 0)
         print(f"✅ Trades gagnants : {wins}")
         print(f"❌ Trades perdants : {losses}")
+        n_warnings = self.event_log.count(WARNING)
+        if n_warnings:
+            print(f"⚠️ Avertissements : {n_warnings} (voir event_log)")
         print("=" * 40)
 
         # Détail par actif
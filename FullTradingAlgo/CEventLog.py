@@ -0,0 +1,77 @@
+from collections import deque
+
+import pandas as pd
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+
+class CEventLog:
+    """
+    Journal d'évènements en mémoire (transitions d'état des stratégies, avertissements de
+    l'évaluateur) qui remplace les print() dans la boucle de trading.
+
+    - level    : niveau minimal enregistré (DEBUG < INFO < WARNING)
+    - capacity : taille du tampon circulaire (None = illimité) ; les plus anciens sont écrasés
+    - echo     : affiche aussi chaque évènement (utile en production)
+
+    Après le run : `to_dataframe()` pour l'analyse, `dump(path)` pour l'écrire sur disque.
+    """
+
+    COLUMNS = ["timestamp", "symbol", "old_state", "new_state", "reason", "level"]
+
+    def __init__(self, level=INFO, capacity=None, echo=False):
+        self.level = level
+        self.echo = echo
+        self._events = deque(maxlen=capacity)
+
+    def log(self, timestamp, symbol, old_state=None, new_state=None, reason="", level=INFO):
+        if level < self.level:
+            return
+        self._events.append((timestamp, symbol, old_state, new_state, reason, level))
+        if self.echo:
+            print(self._format(self._events[-1]))
+
+    def warning(self, timestamp, symbol, reason):
+        self.log(timestamp, symbol, reason=reason, level=WARNING)
+
+    def extend(self, other):
+        """Ajoute les évènements d'un autre journal (ex: fusion de backtests parallèles)."""
+        self._events.extend(other._events)
+
+    @staticmethod
+    def _format(event):
+        timestamp, symbol, old_state, new_state, reason, level = event
+        transition = f" {old_state} -> {new_state}" if old_state is not None or new_state is not None else ""
+        reason = f" ({reason})" if reason else ""
+        return f"[{_LEVEL_NAMES.get(level, level)}] {timestamp} {symbol}:{transition}{reason}"
+
+    def to_dataframe(self, min_level=DEBUG):
+        df = pd.DataFrame(list(self._events), columns=self.COLUMNS)
+        df = df[df["level"] >= min_level].reset_index(drop=True)
+        df["level"] = df["level"].map(lambda lv: _LEVEL_NAMES.get(lv, lv))
+        return df
+
+    def dump(self, path, min_level=DEBUG):
+        """Écrit le journal (CSV si l'extension est .csv, pickle pandas sinon)."""
+        df = self.to_dataframe(min_level)
+        if path.endswith(".csv"):
+            df.to_csv(path, index=False)
+        else:
+            df.to_pickle(path)
+        print(f"✅ Journal d'évènements sauvegardé : {path} ({len(df)} évènements)")
+
+    def count(self, level=None):
+        """Nombre d'évènements enregistrés, éventuellement d'un niveau donné."""
+        if level is None:
+            return len(self._events)
+        return sum(1 for event in self._events if event[5] == level)
+
+    def clear(self):
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
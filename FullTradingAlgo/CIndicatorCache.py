@@ -0,0 +1,164 @@
+import hashlib
+import inspect
+import os
+import pickle
+
+import pandas as pd
+
+# Seuls les modules sous ce répertoire entrent dans la clé d'un indicateur (pas numpy, pandas...)
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CIndicatorCache:
+    """
+    Cache disque des colonnes d'indicateurs, adressé par contenu.
+
+    Clé d'une entrée = hash(colonnes lues par l'indicateur + index, classe de l'indicateur +
+    source de son module et des modules du projet dont il dépend, paramètres). Chaque appel
+    d'indicateur est une entrée distincte : si l'on ajoute un indicateur à une stratégie, seuls
+    ses calculs sont refaits, les autres sont relus. Modifier le code d'un indicateur ou d'un
+    module qu'il utilise (ex: CRSICalculator pour CMultiRSICalculator) invalide ses entrées.
+
+    Les colonnes lues sont déclarées par l'appelant (`inputs`) ; sans déclaration, tout le
+    DataFrame est haché (correct mais sensible aux colonnes ajoutées par d'autres indicateurs).
+
+    Seules les colonnes ajoutées par l'indicateur sont stockées (un pickle par entrée).
+    Éviction LRU (date de dernier accès = mtime du fichier) au-delà de `max_bytes` ou de
+    `max_entries`. Les écritures sont atomiques (fichier temporaire + os.replace), plusieurs
+    processus peuvent partager le même répertoire.
+
+    Hypothèse : l'indicateur ne fait qu'ajouter des colonnes (index et colonnes d'entrée
+    inchangés) ; sinon le résultat est retourné sans être mis en cache.
+    """
+
+    def __init__(self, cache_dir="../cache/indicators", max_bytes=2 * 1024 ** 3, max_entries=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._module_hashes = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------ clés
+
+    @staticmethod
+    def data_key(df, inputs=None):
+        """Hash du contenu lu par un indicateur : index, noms, types et valeurs des colonnes `inputs` (toutes si None)."""
+        if inputs is not None:
+            df = df[list(inputs)]
+        h = hashlib.sha256()
+        h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def _project_dependencies(module):
+        """Modules du projet (fichiers sous PROJECT_DIR) utilisés par `module`, lui compris, récursivement."""
+        found, stack = {}, [module]
+        while stack:
+            current = stack.pop()
+            path = os.path.abspath(getattr(current, "__file__", None) or "")
+            if current.__name__ in found or not path.startswith(PROJECT_DIR + os.sep):
+                continue
+            found[current.__name__] = current
+            for value in vars(current).values():
+                dependency = value if inspect.ismodule(value) else inspect.getmodule(value)
+                if dependency is not None and dependency.__name__ not in found:
+                    stack.append(dependency)
+        return [found[name] for name in sorted(found)]
+
+    def _indicator_key(self, indicator):
+        module = inspect.getmodule(indicator)
+        name = f"{getattr(module, '__name__', '?')}.{getattr(indicator, '__qualname__', repr(indicator))}"
+        if name not in self._module_hashes:
+            h = hashlib.sha256()
+            for dependency in self._project_dependencies(module) if module is not None else []:
+                try:
+                    source = inspect.getsource(dependency)
+                except (TypeError, OSError):
+                    source = ""
+                h.update(f"{dependency.__name__}\n{source}\n".encode())
+            self._module_hashes[name] = h.hexdigest()
+        return f"{name}:{self._module_hashes[name]}"
+
+    def make_key(self, df, indicator, params, inputs=None):
+        h = hashlib.sha256()
+        h.update(self.data_key(df, inputs).encode())
+        h.update(self._indicator_key(indicator).encode())
+        h.update(repr(sorted(params.items())).encode())
+        return h.hexdigest()
+
+    # ---------------------------------------------------------------- calcul
+
+    def get_or_compute(self, df, indicator, params, compute, inputs=None):
+        """
+        Retourne `compute(df)` (df + colonnes de l'indicateur), en relisant les colonnes depuis
+        le disque si la même entrée (colonnes `inputs` de df, indicator, params) a déjà été calculée.
+        """
+        key = self.make_key(df, indicator, params, inputs)
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+
+        try:
+            with open(path, "rb") as f:
+                columns = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            columns = None
+
+        if columns is not None:
+            self.hits += 1
+            os.utime(path)  # dernier accès, pour l'éviction LRU
+            existing = [col for col in columns.columns if col in df.columns]
+            base = df.drop(columns=existing) if existing else df
+            return pd.concat([base, columns], axis=1)
+
+        self.misses += 1
+        result = compute(df)
+        if result.index.equals(df.index):
+            new_cols = [col for col in result.columns if col not in df.columns]
+            self._store(path, result[new_cols])
+        return result
+
+    def apply(self, df, indicator_cls, inputs=None, **params):
+        """Raccourci pour les indicateurs de la forme `indicator_cls(df, **params).get_df()`."""
+        return self.get_or_compute(df, indicator_cls, params, lambda d: indicator_cls(d, **params).get_df(), inputs)
+
+    # -------------------------------------------------------------- stockage
+
+    def _store(self, path, columns):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(columns, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        entries.sort()  # plus anciens accès en premier
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, name in entries:
+            over_size = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_size or over_count):
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(self.cache_dir, name))
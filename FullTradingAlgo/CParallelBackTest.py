@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import CEvaluateROI
+import CInterfaceTrades
+import CTradingAlgo
+
+
+def symbol_file(symbol, start_date="20250101_0101", end_date="20250724_0101", folder="panda"):
+    """Chemin du fichier .panda d'un symbole."""
+    return f"{folder}/{symbol}_{start_date}_{end_date}.panda"
+
+
+def load_symbol_data(symbols, start_date="20250101_0101", end_date="20250724_0101", folder="panda"):
+    """
+    Charge automatiquement les DataFrames .panda pour une liste de symboles.
+
+    Args:
+        symbols (list): Liste des symboles (ex: ["BTCUSDC", "ETHUSDC"])
+        start_date (str): Date de début au format AAAAMMJJ_HHMM
+        end_date (str): Date de fin au format AAAAMMJJ_HHMM
+        folder (str): Dossier contenant les fichiers .panda
+
+    Returns:
+        list: Liste de tuples (DataFrame, symbole)
+    """
+    list_data = []
+    for sym in symbols:
+        filename = symbol_file(sym, start_date, end_date, folder)
+        try:
+            df = pd.read_pickle(filename)
+            list_data.append((df, sym))
+        except FileNotFoundError:
+            print(f"⚠️ Fichier introuvable : {filename}")
+    return list_data
+
+
+def _run_shard(task):
+    """
+    Exécuté dans un processus du pool : simule un groupe de symboles avec sa part du capital.
+    Les données sont chargées dans le processus pour ne pas transférer les DataFrames.
+    """
+    list_data = load_symbol_data(task["symbols"], task["start_date"], task["end_date"], task["folder"])
+    evaluator = CEvaluateROI.CEvaluateROI(task["initial_usdc"], trading_fee_rate=task["trading_fee_rate"])
+    algo = CTradingAlgo.CTradingAlgo(
+        CInterfaceTrades.CInterfaceTrades(evaluator),
+        risk_per_trade_pct=task["risk_per_trade_pct"],
+        strategy_name=task["strategy_name"],
+        show_progress=False,
+        event_log=evaluator.event_log  # un seul journal par groupe, fusionné avec l'évaluateur
+    )
+    if list_data:
+        algo.run(list_data, execution=False)
+    return evaluator
+
+
+class CParallelBackTest:
+    """
+    Backtest réparti sur plusieurs processus, un groupe de `symbols_per_shard` symboles par tâche.
+
+    Réconciliation du capital (allocation par symbole) :
+    le capital initial est divisé à parts égales entre les symboles dont le .panda existe
+    (les autres sont écartés avant le partage), chaque groupe est simulé
+    avec la somme des parts de ses symboles et un CEvaluateROI qui lui est propre, puis les
+    évaluateurs sont fusionnés avec `CEvaluateROI.merge` dans l'ordre des symboles.
+    Un symbole ne peut donc engager que sa part du capital : les résultats diffèrent d'un run
+    séquentiel où tous les symboles puisent dans le même solde, mais ne dépendent ni du nombre
+    de processus ni de leur ordre de fin.
+    """
+
+    def __init__(self, strategy_name="RSI5min30", initial_usdc=1000.0, trading_fee_rate=0.001,
+                 risk_per_trade_pct=0.1, n_workers=None, symbols_per_shard=1,
+                 start_date="20250101_0101", end_date="20250724_0101", folder="panda"):
+        self.strategy_name = strategy_name
+        self.initial_usdc = initial_usdc
+        self.trading_fee_rate = trading_fee_rate
+        self.risk_per_trade_pct = risk_per_trade_pct
+        self.n_workers = n_workers or os.cpu_count()
+        self.symbols_per_shard = symbols_per_shard
+        self.start_date = start_date
+        self.end_date = end_date
+        self.folder = folder
+
+    def _make_tasks(self, symbols):
+        usdc_per_symbol = self.initial_usdc / len(symbols)
+        tasks = []
+        for k in range(0, len(symbols), self.symbols_per_shard):
+            shard = symbols[k:k + self.symbols_per_shard]
+            tasks.append({
+                "symbols": shard,
+                "initial_usdc": usdc_per_symbol * len(shard),
+                "trading_fee_rate": self.trading_fee_rate,
+                "risk_per_trade_pct": self.risk_per_trade_pct,
+                "strategy_name": self.strategy_name,
+                "start_date": self.start_date,
+                "end_date": self.end_date,
+                "folder": self.folder,
+            })
+        return tasks
+
+    def run(self, symbols):
+        """
+        Lance les groupes de symboles en parallèle et retourne l'évaluateur fusionné.
+        Les résultats par symbole sont sauvegardés dans ./panda_results par chaque processus.
+        """
+        if not symbols:
+            raise ValueError("Aucun symbole à simuler")
+
+        # Seuls les symboles dont le .panda existe reçoivent une part du capital
+        available = []
+        for symbol in symbols:
+            if os.path.isfile(symbol_file(symbol, self.start_date, self.end_date, self.folder)):
+                available.append(symbol)
+            else:
+                print(f"⚠️ Fichier introuvable, symbole ignoré : {symbol}")
+        if not available:
+            raise ValueError("Aucun fichier .panda trouvé pour les symboles demandés")
+        symbols = available
+
+        tasks = self._make_tasks(symbols)
+        print(f"⚡ Backtest parallèle : {len(symbols)} symboles, {len(tasks)} tâches, {self.n_workers} processus")
+
+        # map() conserve l'ordre des tâches -> fusion déterministe
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            evaluators = list(executor.map(_run_shard, tasks))
+
+        return CEvaluateROI.CEvaluateROI.merge(evaluators)
@@ -0,0 +1,106 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import CEvaluateROI
+import CInterfaceTrades
+import CTradingAlgo
+from CEventLog import CEventLog, WARNING
+from CSharedMarketData import CSharedMarketData
+from CParallelBackTest import load_symbol_data
+
+# Données attachées une fois par processus du pool (voir _init_worker)
+_WORKER_DATA = {}
+
+
+def _init_worker(meta):
+    list_data, segments = CSharedMarketData.attach(meta)
+    _WORKER_DATA["list_data"] = list_data
+    _WORKER_DATA["segments"] = segments
+
+
+def _run_combination(task):
+    """Exécuté dans un processus du pool : un backtest complet pour une combinaison de paramètres."""
+    evaluator = CEvaluateROI.CEvaluateROI(task["initial_usdc"], trading_fee_rate=task["trading_fee_rate"])
+    algo = CTradingAlgo.CTradingAlgo(
+        CInterfaceTrades.CInterfaceTrades(evaluator),
+        risk_per_trade_pct=task["risk_per_trade_pct"],
+        strategy_name=task["strategy_name"],
+        show_progress=False,
+        strategy_params=task["params"]
+    )
+    algo.run(_WORKER_DATA["list_data"], execution=False, save_results=False)
+
+    closed = evaluator.closed_trades
+    return {
+        **task["params"],
+        "roi_pct": evaluator.get_roi_percentage(),
+        "final_balance": evaluator.get_final_balance(),
+        "trades": len(closed),
+        "wins": sum(1 for t in closed if t["pnl"] > 0),
+        "losses": sum(1 for t in closed if t["pnl"] <= 0),
+        "max_drawdown_pct": evaluator.get_max_drawdown(),
+    }
+
+
+class CParameterSweep:
+    """
+    Recherche sur grille des paramètres d'une stratégie (ex: CStrat_RSI5min30).
+
+    Les .panda (indicateurs déjà calculés par `apply_indicators`, indépendants des paramètres
+    balayés) sont chargés une seule fois puis placés en mémoire partagée ; chaque processus du
+    pool s'y attache au démarrage et n'exécute que la boucle de trading pour ses combinaisons.
+    """
+
+    def __init__(self, strategy_name="RSI5min30", initial_usdc=1000.0, trading_fee_rate=0.001,
+                 risk_per_trade_pct=0.1, n_workers=None, event_log=None):
+        self.strategy_name = strategy_name
+        self.initial_usdc = initial_usdc
+        self.trading_fee_rate = trading_fee_rate
+        self.risk_per_trade_pct = risk_per_trade_pct
+        self.n_workers = n_workers or os.cpu_count()
+        # Avertissements de la préparation des données (colonnes ignorées...) : journal au lieu de print
+        self.event_log = event_log if event_log is not None else CEventLog()
+
+    @staticmethod
+    def expand_grid(param_grid: dict):
+        """{"a": [1, 2], "b": [3]} -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]"""
+        keys = list(param_grid.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+    def run(self, list_data, param_grid: dict, sort_by="roi_pct"):
+        """
+        Lance toutes les combinaisons de `param_grid` sur `list_data` [(df, symbole), ...]
+        et retourne un DataFrame classé par `sort_by` décroissant.
+        """
+        combinations = self.expand_grid(param_grid)
+        tasks = [{
+            "params": params,
+            "initial_usdc": self.initial_usdc,
+            "trading_fee_rate": self.trading_fee_rate,
+            "risk_per_trade_pct": self.risk_per_trade_pct,
+            "strategy_name": self.strategy_name,
+        } for params in combinations]
+        print(f"🔍 Sweep : {len(tasks)} combinaisons, {len(list_data)} symboles, {self.n_workers} processus")
+
+        shared = CSharedMarketData(event_log=self.event_log).publish(list_data)
+        n_warnings = self.event_log.count(WARNING)
+        if n_warnings:
+            print(f"⚠️ Avertissements : {n_warnings} (voir event_log)")
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                     initargs=(shared.get_meta(),)) as executor:
+                results = list(executor.map(_run_combination, tasks))
+        finally:
+            shared.release()
+
+        table = pd.DataFrame(results)
+        return table.sort_values(sort_by, ascending=False, kind="mergesort").reset_index(drop=True)
+
+    def run_files(self, symbols, param_grid: dict, start_date="20250101_0101", end_date="20250724_0101",
+                  folder="panda", sort_by="roi_pct"):
+        """Comme `run`, en chargeant d'abord les .panda des symboles."""
+        list_data = load_symbol_data(symbols, start_date, end_date, folder)
+        return self.run(list_data, param_grid, sort_by=sort_by)
@@ -0,0 +1,81 @@
+class CPosition:
+    """
+    Position ouverte, enregistrement compact (__slots__) à la place d'un dict par trade.
+    `get(...)` / `pos["champ"]` restent disponibles pour le code qui lisait les anciens dicts.
+    """
+
+    __slots__ = ("symbol", "side", "entry_price", "usdc", "sl", "opened_on", "entry_index")
+
+    def __init__(self, symbol, side, entry_price, usdc, sl=None, opened_on=None, entry_index=None):
+        self.symbol = symbol
+        self.side = side
+        self.entry_price = entry_price
+        self.usdc = usdc
+        self.sl = sl
+        self.opened_on = opened_on
+        self.entry_index = entry_index
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self):
+        return (f"CPosition({self.symbol}, {self.side}, entry={self.entry_price}, usdc={self.usdc}, "
+                f"sl={self.sl}, opened_on={self.opened_on})")
+
+
+class CPositionBook:
+    """
+    Carnet des positions ouvertes indexé par symbole : recherche en O(1),
+    plusieurs positions possibles par symbole (dans leur ordre d'ouverture).
+    Partagé par le moteur (CTradingAlgo) et les stratégies ; CEvaluateROI tient le sien.
+    """
+
+    def __init__(self):
+        self._by_symbol = {}
+        self._count = 0
+
+    def add(self, position):
+        self._by_symbol.setdefault(position.symbol, []).append(position)
+        self._count += 1
+        return position
+
+    def remove(self, position):
+        positions = self._by_symbol.get(position.symbol)
+        if not positions:
+            raise ValueError(f"Aucune position ouverte sur {position.symbol}")
+        for k, p in enumerate(positions):
+            if p is position:
+                del positions[k]
+                break
+        else:
+            raise ValueError(f"Position absente du carnet : {position}")
+        if not positions:
+            del self._by_symbol[position.symbol]
+        self._count -= 1
+
+    def get(self, symbol):
+        """Première position ouverte sur le symbole, ou None."""
+        positions = self._by_symbol.get(symbol)
+        return positions[0] if positions else None
+
+    def get_all(self, symbol):
+        return list(self._by_symbol.get(symbol, ()))
+
+    def symbols(self):
+        return list(self._by_symbol.keys())
+
+    def __contains__(self, symbol):
+        return symbol in self._by_symbol
+
+    def __iter__(self):
+        for positions in self._by_symbol.values():
+            yield from positions
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# Phases mesurées directement ; le reste du temps du run est compté comme "engine"
+# (copies des df, fusion des timestamps, file de priorité, groupby/iterrows du moteur pandas...)
+PHASES = ("strategy.apply", "trades", "annotation", "save")
+
+# Profilage opt-in des scripts (S_BackTest_Main, S_Prod) : désactivé si la variable est absente ou "0"
+PROFILE_ENV = "PYTRADE_PROFILE"
+# Intervalle d'échantillonnage en secondes (ex: 0.005) pour produire en plus profile.folded
+PROFILE_SAMPLE_ENV = "PYTRADE_PROFILE_SAMPLE"
+
+
+class CProfiler:
+    """
+    Instrumentation légère d'un `CTradingAlgo.run` (backtest ou production) :
+
+    - temps cumulé par phase : strategy.apply, trades (CInterfaceTrades / CEvaluateROI),
+      annotation des df, sauvegarde, et le reste (moteur / pandas)
+    - bougies par seconde et par symbole
+    - nombre d'appels de `strategy.apply` par état de la stratégie (si elle fournit get_state)
+
+    Optionnel : `sample_interval` (en secondes) démarre un profileur par échantillonnage qui
+    relève la pile du thread du run et l'écrit au format « collapsed stacks »
+    (`pile;de;fonctions nombre`), lisible par flamegraph.pl ou speedscope.
+
+    Les mesures s'accumulent d'un run à l'autre (utile en production, un run par minute).
+    """
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        Profileur demandé par l'environnement, sinon None (CTradingAlgo sans instrumentation) :
+        PYTRADE_PROFILE=1 active les mesures, PYTRADE_PROFILE_SAMPLE=0.005 ajoute l'échantillonnage.
+        """
+        environ = os.environ if environ is None else environ
+        if environ.get(PROFILE_ENV, "0").strip() in ("", "0"):
+            return None
+        sample_interval = environ.get(PROFILE_SAMPLE_ENV)
+        return cls(sample_interval=float(sample_interval) if sample_interval else None)
+
+    def __init__(self, sample_interval=None, stack_file="profile.folded"):
+        self.sample_interval = sample_interval
+        self.stack_file = stack_file
+
+        self.wall_time = 0.0
+        self.runs = 0
+        self.phase_time = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+        self.symbol_bars = defaultdict(int)       # bougies présentes dans les df
+        self.symbol_evaluated = defaultdict(int)  # bougies réellement passées à strategy.apply
+        self.symbol_time = defaultdict(float)     # temps strategy.apply + actions par symbole
+        self.state_calls = defaultdict(int)
+
+        self._t_start = None
+        self._stacks = defaultdict(int)
+        self._sampler = None
+        self._stop_sampling = threading.Event()
+
+    # ------------------------------------------------------------------ run
+
+    def start(self):
+        self._t_start = time.perf_counter()
+        if self.sample_interval:
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, args=(threading.get_ident(),),
+                                             daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._t_start is None:
+            return
+        self.wall_time += time.perf_counter() - self._t_start
+        self._t_start = None
+        self.runs += 1
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+            if self.stack_file:
+                self.write_stacks(self.stack_file)
+
+    def add(self, phase, elapsed, calls=1):
+        self.phase_time[phase] += elapsed
+        self.phase_calls[phase] += calls
+
+    def add_symbol_bars(self, symbol, n_bars):
+        self.symbol_bars[symbol] += n_bars
+
+    def record_bar(self, symbol, state, t_apply, t_actions):
+        """Appelé par le moteur pour chaque bougie évaluée (chemin critique : reste minimal)."""
+        self.phase_time["strategy.apply"] += t_apply
+        self.phase_calls["strategy.apply"] += 1
+        self.symbol_evaluated[symbol] += 1
+        self.symbol_time[symbol] += t_apply + t_actions
+        if state is not None:
+            self.state_calls[state] += 1
+
+    # ------------------------------------------------------------ sampling
+
+    def _sample_loop(self, thread_id):
+        interval = self.sample_interval
+        stacks = self._stacks
+        while not self._stop_sampling.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stacks[";".join(reversed(names))] += 1
+
+    def write_stacks(self, path):
+        """Écrit les piles échantillonnées au format collapsed (une pile par ligne + nombre)."""
+        with open(path, "w") as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+        print(f"✅ Piles échantillonnées sauvegardées : {path} ({sum(self._stacks.values())} échantillons)")
+
+    # ------------------------------------------------------------- résultats
+
+    def summary(self):
+        """Résumé sous forme de dict (sérialisable en JSON, pour le suivi en CI)."""
+        measured = sum(self.phase_time[p] for p in PHASES)
+        phases = {p: {"time_s": self.phase_time[p], "calls": self.phase_calls[p]} for p in PHASES}
+        phases["engine"] = {"time_s": max(self.wall_time - measured, 0.0), "calls": self.runs}
+        for stats in phases.values():
+            stats["pct"] = 100 * stats["time_s"] / self.wall_time if self.wall_time else 0.0
+
+        symbols = {}
+        for symbol, n_bars in self.symbol_bars.items():
+            evaluated = self.symbol_evaluated.get(symbol, 0)
+            spent = self.symbol_time.get(symbol, 0.0)
+            symbols[symbol] = {
+                "bars": n_bars,
+                "evaluated": evaluated,
+                "time_s": spent,
+                "evaluated_per_s": evaluated / spent if spent else 0.0,
+            }
+
+        bars_total = sum(self.symbol_bars.values())
+        return {
+            "runs": self.runs,
+            "wall_time_s": self.wall_time,
+            "bars_total": bars_total,
+            "bars_evaluated": sum(self.symbol_evaluated.values()),
+            "bars_per_s": bars_total / self.wall_time if self.wall_time else 0.0,
+            "phases": phases,
+            "symbols": symbols,
+            "states": dict(self.state_calls),
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def print_summary(self):
+        s = self.summary()
+        print("⏱️ Profil d'exécution :")
+        print("=" * 40)
+        print(f"🕒 Durée totale     : {s['wall_time_s']:.3f} s ({s['runs']} run(s))")
+        print(f"📈 Bougies          : {s['bars_total']} ({s['bars_evaluated']} évaluées)")
+        print(f"🚀 Débit            : {s['bars_per_s']:.0f} bougies/s")
+        print("=" * 40)
+        for name, stats in s["phases"].items():
+            print(f"   {name:<15}: {stats['time_s']:.3f} s ({stats['pct']:.1f} %) - {stats['calls']} appels")
+
+        if s["states"]:
+            print("\n📊 Appels par état")
+            print("=" * 40)
+            for state, calls in sorted(s["states"].items(), key=lambda kv: -kv[1]):
+                print(f"   {state:<20}: {calls}")
+
+        print("\n📊 Détail par actif")
+        print("=" * 40)
+        for symbol, stats in s["symbols"].items():
+            print(f"🔹 {symbol}: {stats['bars']} bougies, {stats['evaluated']} évaluées, "
+                  f"{stats['evaluated_per_s']:.0f} bougies/s")
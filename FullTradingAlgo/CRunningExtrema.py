@@ -0,0 +1,93 @@
+from collections import deque
+import math
+
+
+class CSlidingExtremum:
+    """
+    Min (ou max) glissant sur les `window` dernières valeurs, par deque monotone :
+    O(1) amorti par valeur ajoutée. Les NaN sont ignorés comme le fait pandas (.min()/.max()).
+
+    Usage typique dans une stratégie (état par symbole) :
+        low_min = CSlidingExtremum(30, "min")
+        sl_price = low_min.advance_to(low_values, i)   # == np.nanmin(low_values[i - 30:i])
+    """
+
+    def __init__(self, window, mode="min"):
+        if mode not in ("min", "max"):
+            raise ValueError(f"Mode inconnu : {mode}")
+        self.window = window
+        self.is_min = mode == "min"
+        self._deque = deque()  # (position, valeur), valeurs monotones
+        self._next = 0         # prochaine position attendue par advance_to
+        self._values = None    # tableau suivi par advance_to (identité et longueur)
+        self._length = 0
+
+    def push(self, i, value):
+        """Ajoute la valeur de la position `i` (positions strictement croissantes)."""
+        dq = self._deque
+        if not math.isnan(value):
+            if self.is_min:
+                while dq and dq[-1][1] >= value:
+                    dq.pop()
+            else:
+                while dq and dq[-1][1] <= value:
+                    dq.pop()
+            dq.append((i, value))
+        while dq and dq[0][0] <= i - self.window:
+            dq.popleft()
+        self._next = i + 1
+
+    def value(self):
+        """Extremum de la fenêtre courante (NaN si elle ne contient aucune valeur)."""
+        return self._deque[0][1] if self._deque else math.nan
+
+    def advance_to(self, values, end):
+        """
+        Rattrape les positions manquantes jusqu'à `end` exclu et retourne l'extremum de
+        values[end - window:end]. Si l'écart dépasse la fenêtre, on repart de zéro :
+        le coût reste borné par `window` quel que soit le nombre de bougies sautées.
+        Si `values` n'est plus le même tableau (nouveau run, df de production rechargé) ou si
+        `end` revient en arrière, le suivi est réinitialisé avant le rattrapage.
+        """
+        if values is not self._values or len(values) != self._length or end < self._next:
+            self.reset()
+            self._values = values
+            self._length = len(values)
+        start = max(self._next, end - self.window, 0)
+        if start > self._next:
+            self._deque.clear()
+        for j in range(start, end):
+            self.push(j, values[j])
+        self._next = max(self._next, end)
+        return self.value()
+
+    def reset(self):
+        self._deque.clear()
+        self._next = 0
+        self._values = None
+        self._length = 0
+
+
+class CRunningMaxThenMin:
+    """
+    Max courant depuis le début du suivi (première occurrence, comme idxmax) et min des
+    valeurs depuis ce max, mis à jour en O(1) par valeur. Équivaut à
+        w = serie[debut:i + 1]; m = w.idxmax(); (w.max(), w.loc[m:].min())
+    sans recalculer la fenêtre à chaque bougie.
+    """
+
+    __slots__ = ("max", "min_after_max")
+
+    def __init__(self):
+        self.max = math.nan
+        self.min_after_max = math.nan
+
+    def update(self, value):
+        if math.isnan(value):
+            return
+        if math.isnan(self.max) or value > self.max:
+            # Nouveau max : la fenêtre « après le max » repart de cette valeur
+            self.max = value
+            self.min_after_max = value
+        elif value < self.min_after_max:
+            self.min_after_max = value
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import resource_tracker, shared_memory
+
+from CEventLog import CEventLog
+
+
+def _attach_segment(name):
+    """
+    Attache un segment existant sans l'enregistrer auprès du resource_tracker : seul le
+    processus principal (publish / release) en est propriétaire. Sinon, avant Python 3.13,
+    l'attache d'un processus du pool l'enregistre aussi, d'où des avertissements de fuite ou
+    une destruction prématurée. Désenregistrer après coup ne convient pas : le tracker est
+    partagé avec le processus principal et y perdrait son propre enregistrement.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class CSharedMarketData:
+    """
+    Données de marché (DataFrames par symbole) placées une seule fois en mémoire partagée.
+
+    Le processus principal appelle `publish` : pour chaque symbole, les colonnes numériques
+    sont copiées dans un bloc float64 (colonnes x lignes) et l'index dans un bloc int64.
+    `get_meta()` retourne une description picklable que les processus du pool passent à
+    `attach` pour reconstruire les DataFrames sans recharger ni recopier les .panda.
+    Les colonnes non numériques (ignorées) sont signalées dans `event_log`.
+    """
+
+    def __init__(self, event_log=None):
+        self._segments = []
+        self._meta = {}
+        self.event_log = event_log if event_log is not None else CEventLog()
+
+    def publish(self, list_data):
+        for df, symbol in list_data:
+            numeric = df.select_dtypes(include="number")
+            skipped = [c for c in df.columns if c not in numeric.columns]
+            if skipped:
+                self.event_log.warning(df.index[0] if len(df) else None, symbol,
+                                       f"Colonnes non numériques ignorées : {skipped}")
+
+            values = self._share(numeric.to_numpy(dtype=np.float64).T)
+            index = self._share(df.index.asi8)
+            self._meta[symbol] = {
+                "values": (values.name, numeric.shape[1], numeric.shape[0]),
+                "index": (index.name, len(df)),
+                "columns": list(numeric.columns),
+                "tz": df.index.tz,
+                "unit": df.index.unit,
+            }
+        return self
+
+    def _share(self, array):
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        self._segments.append(shm)
+        return shm
+
+    def get_meta(self):
+        return self._meta
+
+    @staticmethod
+    def attach(meta):
+        """
+        Côté processus du pool : retourne (list_data, segments). Les segments doivent rester
+        référencés tant que les DataFrames sont utilisés (ils portent la mémoire) ; ils ne sont
+        pas suivis par le resource_tracker, `release` dans le processus principal les détruit.
+        """
+        list_data, segments = [], []
+        for symbol, info in meta.items():
+            values_name, n_cols, n_rows = info["values"]
+            index_name, n_index = info["index"]
+
+            shm_values = _attach_segment(values_name)
+            shm_index = _attach_segment(index_name)
+            segments += [shm_values, shm_index]
+
+            values = np.ndarray((n_cols, n_rows), dtype=np.float64, buffer=shm_values.buf)
+            index = np.ndarray((n_index,), dtype=np.int64, buffer=shm_index.buf)
+            dt_index = pd.DatetimeIndex(index.view(f"datetime64[{info['unit']}]"))
+            if info["tz"] is not None:
+                dt_index = dt_index.tz_localize("UTC").tz_convert(info["tz"])
+
+            df = pd.DataFrame(values.T, index=dt_index, columns=info["columns"], copy=False)
+            list_data.append((df, symbol))
+        return list_data, segments
+
+    def release(self):
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments = []
+        self._meta = {}
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+
+class CSyntheticCandles:
+    """
+    Générateur déterministe de bougies 1m OHLCV, au même format que les .panda produits par
+    CTransformToPanda (index "time", colonnes open/high/low/close/volume/moy_l_h_e_c).
+
+    Marche aléatoire log-normale avec une composante de régime (tendance lente) pour que les
+    indicateurs (RSI, pics, ruptures, patterns) aient des signaux à détecter. Même graine,
+    même symbole, même taille -> mêmes bougies : sert aux benchmarks hors ligne.
+    """
+
+    def __init__(self, seed=42, start="2025-01-01 00:00", volatility=0.004, start_price=100.0):
+        self.seed = seed
+        self.start = start
+        self.volatility = volatility
+        self.start_price = start_price
+
+    def generate(self, n_minutes, symbol_index=0):
+        rng = np.random.default_rng([self.seed, symbol_index])
+        index = pd.date_range(self.start, periods=n_minutes, freq="1min", name="time")
+
+        # Tendance lente (régimes de quelques heures) + bruit minute
+        drift = np.repeat(rng.normal(0, self.volatility / 40, n_minutes // 240 + 1), 240)[:n_minutes]
+        returns = drift + rng.normal(0, self.volatility, n_minutes)
+        price = self.start_price * (1 + symbol_index)
+        close = price * np.exp(np.cumsum(returns))
+        open_ = np.r_[price, close[:-1]]
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, self.volatility / 4, n_minutes)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, self.volatility / 4, n_minutes)))
+        volume = rng.lognormal(3, 1, n_minutes)
+
+        df = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                          index=index)
+        df["moy_l_h_e_c"] = (df["open"] + df["close"] + df["high"] + df["low"]) / 4
+        return df
+
+    def generate_symbols(self, n_minutes, n_symbols):
+        """Liste [(df, symbole), ...] comme celle attendue par CTradingAlgo.run."""
+        return [(self.generate(n_minutes, k), f"SYN{k:03d}USDC") for k in range(n_symbols)]
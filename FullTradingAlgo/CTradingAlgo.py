@@ -1,55 +1,144 @@
+import heapq
 import os
+import time
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from CBarCursor import CBarCursor
+from CEventLog import CEventLog
+from CProfiler import CProfiler
+from CPositionBook import CPosition, CPositionBook
+
 # from strategies.CStrat_4h_HA import CStrat_4h_HA
 from strategies.CStrat_RSI5min30 import CStrat_RSI5min30
 
+BAR_INDEX_COL = "_bar_i"
+
+# Colonne d'annotation renseignée pour chaque type d'action
+ANNOTATION_COLS = {
+    "OPEN": "entry_price_*_g_P1",
+    "CLOSE": "exit_price_*_r_P1",
+    "M1": "entry_price_^_g_P1",
+    "M2": "entry_price_v_g_P1",
+}
+# Colonnes toujours présentes dans les résultats (M1/M2 seulement si utilisées)
+DEFAULT_ANNOTATION_COLS = ["entry_price_*_g_P1", "exit_price_*_r_P1"]
+
 
 class CTradingAlgo:
-    def __init__(self, l_interface_trade, risk_per_trade_pct: float = 0.1, strategy_name: str = "strategy_1"):
+    def __init__(self, l_interface_trade, risk_per_trade_pct: float = 0.1, strategy_name: str = "strategy_1",
+                 engine: str = "array", show_progress: bool = True, strategy_params: dict = None,
+                 skip_idle_bars: bool = True, event_log: CEventLog = None, profiler: CProfiler = None):
         self.interface_trade = l_interface_trade
         self.risk_per_trade_pct = risk_per_trade_pct
         self.strategy_name = strategy_name
         self.stop_loss_ratio = 0.98
 
-        self.open_positions = []
+        # "array"  : boucle sur tableaux NumPy pré-extraits (rapide)
+        # "pandas" : boucle historique groupby + iterrows (référence)
+        if engine not in ("array", "pandas"):
+            raise ValueError(f"Moteur inconnu : {engine}")
+        self.engine = engine
+        self.show_progress = show_progress
+        # Moteur "array" : saute les bougies inactives si la stratégie fournit get_wakeup_masks
+        self.skip_idle_bars = skip_idle_bars
+
+        # Positions ouvertes par symbole, partagées avec la stratégie
+        self.open_positions = CPositionBook()
         self.closed_count = 0
         self.total_trades = 0
 
         # Stockage des DataFrames par symbol
         self.symbol_dfs = {}
+        # Annotations (prix d'entrée/sortie, marqueurs) par symbol : {colonne: tableau float}
+        self.symbol_annotations = {}
+
+        # Instrumentation optionnelle (temps par phase, débit, appels par état) ; None = aucun surcoût
+        self.profiler = profiler
+
+        # Journal des transitions d'état de la stratégie (remplace les traces print)
+        self.event_log = event_log if event_log is not None else CEventLog()
+
+        # Paramètres supplémentaires transmis au constructeur de la stratégie (ex: sweep)
+        strategy_params = strategy_params or {}
 
         # Dynamically instantiate the strategy class
         if self.strategy_name == "4h_HA":
-            self.strategy = CStrat_4h_HA(self.interface_trade, self.risk_per_trade_pct, self.stop_loss_ratio)
+            self.strategy = CStrat_4h_HA(self.interface_trade, self.risk_per_trade_pct, self.stop_loss_ratio,
+                                         **strategy_params)
         elif self.strategy_name == "rsi_30":
-            self.strategy = CStrat_RSI30(self.interface_trade, self.risk_per_trade_pct, self.stop_loss_ratio)
+            self.strategy = CStrat_RSI30(self.interface_trade, self.risk_per_trade_pct, self.stop_loss_ratio,
+                                         **strategy_params)
         elif self.strategy_name == "RSI5min30":
-            self.strategy = CStrat_RSI5min30(self.interface_trade, self.risk_per_trade_pct)
+            self.strategy = CStrat_RSI5min30(self.interface_trade, self.risk_per_trade_pct,
+                                             event_log=self.event_log, **strategy_params)
         else:
             raise ValueError(f"Stratégie inconnue : {self.strategy_name}")
 
-    def run(self, list_data: list, execution):
+    def run(self, list_data: list, execution, save_results: bool = True):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+        try:
+            self._run(list_data, execution, save_results)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+    def _run(self, list_data, execution, save_results):
+        profiler = self.profiler
         merged = []
+        self.symbol_annotations = {}
         for df, symbol in list_data:
-            df = df.copy()
+            # Copie superficielle : le moteur n'ajoute que des colonnes (symbol, annotations), les
+            # données ne sont pas recopiées (DataFrames en mémoire partagée de CParameterSweep)
+            df = df.copy(deep=False)
             df["symbol"] = symbol
-            # Ajout des colonnes vides
-            df["entry_price_*_g_P1"] = None
-            df["exit_price_*_r_P1"] = None
             self.symbol_dfs[symbol] = df
-            merged.append(df)
+            # Tampons pré-alloués, rattachés au df une seule fois en fin de run
+            self.symbol_annotations[symbol] = {col: np.full(len(df), np.nan) for col in DEFAULT_ANNOTATION_COLS}
+            merged.append((df, symbol))
+            if profiler is not None:
+                profiler.add_symbol_bars(symbol, len(df))
+
+        # Variante instrumentée de _step choisie une fois pour toute la boucle
+        self._step_fn = self._step if profiler is None else self._step_profiled
+        self._get_state = getattr(self.strategy, "get_state", None)
+
+        if self.engine == "array":
+            self._run_array(merged, execution)
+        else:
+            self._run_pandas(merged, execution)
+
+        t0 = time.perf_counter()
+        self._attach_annotations()
+        if profiler is not None:
+            profiler.add("annotation", time.perf_counter() - t0)
 
-        full_df = pd.concat(merged).sort_index()
+        # Sauvegarde des df par pièce
+        if not execution and save_results:
+            t0 = time.perf_counter()
+            self._save_results()
+            if profiler is not None:
+                profiler.add("save", time.perf_counter() - t0)
+
+    def _run_pandas(self, merged, execution):
+        # Position de chaque bougie dans son df, portée par le df fusionné uniquement
+        cursors = {symbol: CBarCursor(df, symbol) for df, symbol in merged}
+        frames = [df.assign(**{BAR_INDEX_COL: np.arange(len(df))}) for df, _ in merged]
+
+        # Tri stable : à timestamp égal, les symboles gardent l'ordre de list_data
+        full_df = pd.concat(frames).sort_index(kind="mergesort")
         grouped = full_df.groupby(full_df.index)
         total_ticks = len(grouped)
 
         # Initialisation de blocked
         blocked = execution  # si exec=False -> blocked=False, si exec=True -> blocked=True
+        step = self._step_fn
 
         for i, (timestamp, group) in enumerate(
-                tqdm(grouped, total=total_ticks, desc="🔄 Simulation trading")
+                tqdm(grouped, total=total_ticks, desc="🔄 Simulation trading", disable=not self.show_progress)
         ):
             # Si on est sur la dernière minute et que exec=True, on débloque
             if execution and i == total_ticks - 1:
@@ -57,63 +146,181 @@ class CTradingAlgo:
 
             for _, row in group.iterrows():
                 symbol = row["symbol"]
-                df = self.symbol_dfs[symbol]
-                if timestamp not in df.index:
-                    continue
-
-                actions = self.strategy.apply(df, symbol, row, timestamp, self.open_positions, blocked)
-
-                if blocked:
-                    continue
-
-                for action in actions:
-                    if action["action"] == "OPEN":
-                        self._open_position(
-                            symbol=action["symbol"],
-                            price=action["price"],
-                            sl=action["sl"],
-                            timestamp=timestamp,
-                            side=action["side"],
-                            usdc=action["usdc"]
-                        )
-                        # On écrit dans la colonne entry_price
-                        df.loc[timestamp, "entry_price_*_g_P1"] = action["price"]
-
-                    elif action["action"] == "CLOSE":
-                        self._close_position(
-                            pos=action["position"],
-                            exit_price=action["exit_price"],
-                            symbol=action["symbol"],
-                            timestamp=timestamp,
-                            exit_side=action["exit_side"],
-                            reason=action["reason"]
-                        )
-                        # On écrit dans la colonne exit_price
-                        df.loc[timestamp, "exit_price_*_r_P1"] = action["exit_price"]
-
-                    elif action["action"] == "M1":
-                        df.loc[timestamp, "entry_price_^_g_P1"] = action["price"]
-
-                    elif action["action"] == "M2":
-                        df.loc[timestamp, "entry_price_v_g_P1"] = action["price"]
+                step(self.symbol_dfs[symbol], cursors[symbol], row[BAR_INDEX_COL], timestamp, blocked, row=row)
 
-        # Sauvegarde des df par pièce
-        if not execution:
-            self._save_results()
+    def _run_array(self, merged, execution):
+        """
+        Même simulation que `_run_pandas`, sans concaténation ni iterrows :
+        chaque symbole est extrait une fois en tableaux NumPy, les timestamps
+        sont fusionnés une seule fois, puis on parcourt le flux d'évènements
+        (tick, symbole, position de la bougie) trié comme le ferait le groupby.
+        """
+        timeline = merged[0][0].index
+        for df, _ in merged[1:]:
+            timeline = timeline.append(df.index)
+        timeline = timeline.unique().sort_values()
+        timestamps = list(timeline)
+
+        dfs, cursors, ticks = [], [], []
+        for df, symbol in merged:
+            dfs.append(df)
+            cursors.append(CBarCursor(df, symbol))
+            ticks.append(timeline.get_indexer(df.index))
+
+        if (self.skip_idle_bars and hasattr(self.strategy, "get_wakeup_masks")
+                and all(df.index.is_monotonic_increasing for df in dfs)):
+            self._loop_wakeup(dfs, cursors, ticks, timestamps, execution)
+        else:
+            self._loop_all_bars(dfs, cursors, ticks, timestamps, execution)
+
+    def _loop_all_bars(self, dfs, cursors, ticks, timestamps, execution):
+        sym_ids = np.concatenate([np.full(len(t), k) for k, t in enumerate(ticks)])
+        bars = np.concatenate([np.arange(len(t)) for t in ticks])
+        ticks = np.concatenate(ticks)
+        # Ordre : timestamp, puis ordre de list_data, puis ordre d'origine dans le symbole
+        order = np.lexsort((bars, sym_ids, ticks))
+        events = zip(ticks[order].tolist(), sym_ids[order].tolist(), bars[order].tolist())
+
+        last_tick = len(timestamps) - 1
+        step = self._step_fn
+        for tick, k, i in tqdm(events, total=len(order), desc="🔄 Simulation trading",
+                                  disable=not self.show_progress):
+            step(dfs[k], cursors[k], i, timestamps[tick], execution and tick != last_tick)
+
+    def _loop_wakeup(self, dfs, cursors, ticks, timestamps, execution):
+        """
+        Variante événementielle : la stratégie déclare, pour certains de ses états, un masque
+        vectorisé des bougies où `apply` peut agir (`get_wakeup_masks`). Tant qu'un symbole est
+        dans un tel état, on saute directement à sa prochaine bougie « réveil » ; les autres
+        bougies ne produiraient ni action ni changement d'état. Une file de priorité
+        (tick, symbole, bougie) conserve exactement l'ordre de `_loop_all_bars`.
+        """
+        wakeups = []
+        for df, cursor in zip(dfs, cursors):
+            masks = self.strategy.get_wakeup_masks(cursor.symbol, cursor)
+            # Positions des bougies réveil par état, pour un saut par recherche dichotomique
+            wakeups.append({state: np.flatnonzero(mask) for state, mask in masks.items()})
+
+        heap = [(int(t[0]), k, 0) for k, t in enumerate(ticks) if len(t)]
+        heapq.heapify(heap)
+        ticks = [t.tolist() for t in ticks]
+
+        last_tick = len(timestamps) - 1
+        step = self._step_fn
+        progress = tqdm(total=len(timestamps), desc="🔄 Simulation trading", disable=not self.show_progress)
+        done_ticks = 0
+        while heap:
+            tick, k, i = heapq.heappop(heap)
+            if tick >= done_ticks:
+                progress.update(tick + 1 - done_ticks)
+                done_ticks = tick + 1
+
+            cursor = cursors[k]
+            step(dfs[k], cursor, i, timestamps[tick], execution and tick != last_tick)
+
+            next_i = i + 1
+            positions = wakeups[k].get(self.strategy.get_state(cursor.symbol))
+            if positions is not None:
+                j = np.searchsorted(positions, next_i)
+                next_i = int(positions[j]) if j < len(positions) else len(ticks[k])
+            if next_i < len(ticks[k]):
+                heapq.heappush(heap, (ticks[k][next_i], k, next_i))
+        progress.close()
+
+    def _step(self, df, cursor, i, timestamp, blocked, row=None):
+        """
+        Traite une bougie d'un symbole. `cursor` est le curseur du symbole, placé ici sur la
+        bougie ; il sert aussi de `row` sauf pour le moteur pandas qui passe sa ligne iterrows.
+        """
+        cursor.move(i, timestamp)
+
+        actions = self.strategy.apply(df, cursor.symbol, cursor if row is None else row, timestamp,
+                                      self.open_positions, blocked, i=i, cursor=cursor)
+
+        if blocked:
+            return
+
+        self._apply_actions(actions, cursor.symbol, i, timestamp)
+
+    def _step_profiled(self, df, cursor, i, timestamp, blocked, row=None):
+        """`_step` instrumenté : temps de strategy.apply, des actions, et état de la stratégie."""
+        profiler = self.profiler
+        symbol = cursor.symbol
+        state = self._get_state(symbol) if self._get_state is not None else None
+        state = getattr(state, "name", state)
+
+        t0 = time.perf_counter()
+        cursor.move(i, timestamp)
+        actions = self.strategy.apply(df, symbol, cursor if row is None else row, timestamp,
+                                      self.open_positions, blocked, i=i, cursor=cursor)
+        t1 = time.perf_counter()
+
+        if not blocked and actions:
+            trades_before = profiler.phase_time["trades"]
+            self._apply_actions(actions, symbol, i, timestamp)
+            t2 = time.perf_counter()
+            # Le temps des ordres est compté dans "trades", le reste est de l'annotation
+            profiler.add("annotation", (t2 - t1) - (profiler.phase_time["trades"] - trades_before), len(actions))
+        else:
+            t2 = t1
+        profiler.record_bar(symbol, state, t1 - t0, t2 - t1)
+
+    def _apply_actions(self, actions, symbol, i, timestamp):
+        for action in actions:
+            if action["action"] == "OPEN":
+                self._open_position(
+                    symbol=action["symbol"],
+                    price=action["price"],
+                    sl=action["sl"],
+                    timestamp=timestamp,
+                    side=action["side"],
+                    usdc=action["usdc"]
+                )
+                # On note le prix dans la colonne entry_price
+                self._annotate(symbol, "OPEN", i, action["price"])
+
+            elif action["action"] == "CLOSE":
+                self._close_position(
+                    pos=action["position"],
+                    exit_price=action["exit_price"],
+                    symbol=action["symbol"],
+                    timestamp=timestamp,
+                    exit_side=action["exit_side"],
+                    reason=action["reason"]
+                )
+                # On note le prix dans la colonne exit_price
+                self._annotate(symbol, "CLOSE", i, action["exit_price"])
+
+            elif action["action"] in ("M1", "M2"):
+                self._annotate(symbol, action["action"], i, action["price"])
+
+    def _annotate(self, symbol, action_type, i, price):
+        col = ANNOTATION_COLS[action_type]
+        buffers = self.symbol_annotations[symbol]
+        values = buffers.get(col)
+        if values is None:
+            values = buffers[col] = np.full(len(self.symbol_dfs[symbol]), np.nan)
+        values[i] = price
+
+    def _attach_annotations(self):
+        """Rattache en une fois les tampons d'annotations aux df des symboles (colonnes float)."""
+        for symbol, buffers in self.symbol_annotations.items():
+            df = self.symbol_dfs[symbol]
+            for col, values in buffers.items():
+                df[col] = values
 
     def _open_position(self, symbol, price, sl, timestamp, side, usdc):
-        self.open_positions.append({
-            "symbol": symbol,
-            "entry_price": price,
-            "sl": sl,
-            "date": timestamp,
-            "opened_on": timestamp,
-            "side": side,
-            "usdc": usdc
-        })
+        self.open_positions.add(CPosition(
+            symbol=symbol,
+            side=side,
+            entry_price=price,
+            usdc=usdc,
+            sl=sl,
+            opened_on=timestamp
+        ))
 
         trade_side = "BUY_LONG" if side == "LONG" else "SELL_SHORT"
-        self.interface_trade.add_trade(
+        self._send_trade(
             price=price,
             side=trade_side,
             asset=symbol,
@@ -123,18 +330,26 @@ class CTradingAlgo:
         self.total_trades += 1
 
     def _close_position(self, pos, exit_price, symbol, timestamp, exit_side, reason):
-        self.interface_trade.add_trade(
+        self._send_trade(
             price=exit_price,
             side=exit_side,
             asset=symbol,
             timestamp=timestamp,
             exit_type=reason,
-            amount_usdc=pos["usdc"]
+            amount_usdc=pos.usdc
         )
         self.closed_count += 1
         self.total_trades += 1
         self.open_positions.remove(pos)
 
+    def _send_trade(self, **trade):
+        if self.profiler is None:
+            self.interface_trade.add_trade(**trade)
+            return
+        t0 = time.perf_counter()
+        self.interface_trade.add_trade(**trade)
+        self.profiler.add("trades", time.perf_counter() - t0)
+
     def _save_results(self):
         os.makedirs("./panda_results", exist_ok=True)
         for symbol, df in self.symbol_dfs.items():
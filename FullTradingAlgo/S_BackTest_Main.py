@@ -5,35 +5,19 @@ import BinanceCandlePlotter
 import CTradingAlgo
 import CBitgetTrader
 import pandas as pd
-
-def load_symbol_data(symbols, start_date="20250101_0101", end_date="20250724_0101", folder="panda"):
-    """
-    Charge automatiquement les DataFrames .panda pour une liste de symboles.
-
-    Args:
-        symbols (list): Liste des symboles (ex: ["BTCUSDC", "ETHUSDC"])
-        start_date (str): Date de début au format AAAAMMJJ_HHMM
-        end_date (str): Date de fin au format AAAAMMJJ_HHMM
-        folder (str): Dossier contenant les fichiers .panda
-
-    Returns:
-        list: Liste de tuples (DataFrame, symbole)
-    """
-    list_data = []
-    for sym in symbols:
-        filename = f"{folder}/{sym}_{start_date}_{end_date}.panda"
-        try:
-            df = pd.read_pickle(filename)
-            list_data.append((df, sym))
-        except FileNotFoundError:
-            print(f"⚠️ Fichier introuvable : {filename}")
-    return list_data
+from CParallelBackTest import load_symbol_data
+from CEventLog import CEventLog
+from CProfiler import CProfiler
 
 # Création de l'évaluateur
-evaluator = CEvaluateROI.CEvaluateROI(1000,trading_fee_rate=0.000)
+event_log = CEventLog()  # transitions d'état + avertissements de l'évaluateur
+evaluator = CEvaluateROI.CEvaluateROI(1000,trading_fee_rate=0.000, event_log=event_log)
 
 l_interface_trade = CInterfaceTrades.CInterfaceTrades(evaluator)
-algo = CTradingAlgo.CTradingAlgo(l_interface_trade, risk_per_trade_pct=1,strategy_name="RSI5min30")
+# Profilage opt-in : PYTRADE_PROFILE=1 (et PYTRADE_PROFILE_SAMPLE=0.005 pour un profile.folded)
+profiler = CProfiler.from_env()
+algo = CTradingAlgo.CTradingAlgo(l_interface_trade, risk_per_trade_pct=1,strategy_name="RSI5min30",
+                                 event_log=event_log, profiler=profiler)
 
 # Liste des symboles à analyser
 symbols = [
@@ -53,6 +37,9 @@ list_data = load_symbol_data(symbols)
 algo.run(list_data,execution=False)
 
 evaluator.print_summary()
+if profiler is not None:
+    profiler.print_summary()
+event_log.dump("event_log.csv")
 evaluator.plot_combined()
 
 plotter = BinanceCandlePlotter.BinanceCandlePlotter(symbol="KAITOUSDC")
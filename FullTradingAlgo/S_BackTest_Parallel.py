@@ -0,0 +1,25 @@
+import CParallelBackTest
+
+if __name__ == "__main__":
+    # Liste des symboles à analyser (univers complet de S_BinanceCandleDownloaderPublic possible)
+    symbols = [
+        "SHIBUSDC",
+        "SOLUSDC",
+        #"DOGEUSDC"
+    ]
+
+    backtest = CParallelBackTest.CParallelBackTest(
+        strategy_name="RSI5min30",
+        initial_usdc=1000,
+        trading_fee_rate=0.000,
+        risk_per_trade_pct=1,
+        n_workers=None,          # None -> un processus par cœur
+        symbols_per_shard=1
+    )
+
+    # Lancement des backtests en parallèle puis fusion des évaluateurs
+    evaluator = backtest.run(symbols)
+
+    evaluator.print_summary()
+    evaluator.event_log.dump("event_log.csv")
+    evaluator.plot_combined()
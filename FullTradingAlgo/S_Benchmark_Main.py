@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+
+import CBenchmark
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne sur bougies synthétiques")
+    parser.add_argument("--profile", default="quick", choices=list(CBenchmark.PROFILES))
+    parser.add_argument("--sizes", nargs="*", help=f"parmi {list(CBenchmark.SIZES)}")
+    parser.add_argument("--symbols", nargs="*", type=int, help="nombres de symboles, ex: 1 10 100")
+    parser.add_argument("--cases", nargs="*", default=["indicators", "strategies", "backtest"])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--csv", default="benchmark_results.csv")
+    args = parser.parse_args()
+
+    bench = CBenchmark.CBenchmark(
+        profile=args.profile,
+        sizes=args.sizes,
+        symbols=args.symbols,
+        repeat=args.repeat,
+        measure_memory=not args.no_memory,
+        cases=tuple(args.cases)
+    )
+    bench.run()
+    bench.to_dataframe().to_csv(args.csv, index=False)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        bench.save_baseline(args.baseline)
+    else:
+        regressions = bench.compare(args.baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+            sys.exit(1)
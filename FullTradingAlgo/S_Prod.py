@@ -2,6 +2,8 @@ import time
 from datetime import datetime, timedelta, timezone
 import CBinanceDataFetcher
 import CTradingAlgo
+from CEventLog import CEventLog
+from CProfiler import CProfiler
 import pandas as pd
 from strategies.CStrat_RSI5min30 import CStrat_RSI5min30
 
@@ -75,7 +77,11 @@ def main():
     # === INITIALISATION ===
     fetcher = CBinanceDataFetcher.BinanceDataFetcher()
     interface_trade = None  # ⚡ Remplacer par ton interface trade réelle
-    algo = CTradingAlgo.CTradingAlgo(l_interface_trade=interface_trade, strategy_name="RSI5min30")
+    # En production les transitions restent affichées au fil de l'eau (echo)
+    # Profilage opt-in (PYTRADE_PROFILE=1) : mesures cumulées sur tous les runs, affichées toutes les heures
+    profiler = CProfiler.from_env()
+    algo = CTradingAlgo.CTradingAlgo(l_interface_trade=interface_trade, strategy_name="RSI5min30",
+                                     event_log=CEventLog(echo=True), profiler=profiler)
 
     # === 1. Téléchargement et simulation historique ===
     print("📥 Téléchargement de l’historique...")
@@ -83,8 +89,10 @@ def main():
 
     # Préparation des DataFrames par symbole
     symbol_dfs = {}
+    indicator_streams = {}  # symbole -> RSI incrémentaux, pour ne pas recalculer tout l'historique chaque minute
     for sym in symbols:
         df_sym = df_hist[df_hist["symbol"] == sym].drop(columns=["symbol"])
+        indicator_streams[sym] = algo.strategy.init_indicator_streams(df_sym)
         df_sym = algo.strategy.apply_indicators(df_sym, is_btc_file=(sym == "BTCUSDC"))
         symbol_dfs[sym] = df_sym
 
@@ -110,11 +118,13 @@ def main():
 
             list_data_last = []
             for sym in symbols:
-                df_sym = symbol_dfs[sym]
+                df_prev = symbol_dfs[sym]
                 df_new = df_last[df_last["symbol"] == sym].drop(columns=["symbol"])
-                df_sym = update_symbol_df(df_sym, df_new, sym)
+                df_sym = update_symbol_df(df_prev, df_new, sym)
                 orig_cols = original_cols[sym]
-                df_sym = algo.strategy.apply_indicators(df_sym, is_btc_file=(sym == "BTCUSDC"))
+                # Indicateurs déjà calculés repris tels quels, seules les nouvelles bougies sont calculées
+                df_sym = df_sym.join(df_prev.drop(columns=df_sym.columns))
+                df_sym = algo.strategy.update_indicators(df_sym, indicator_streams[sym], since=df_prev.index[-1])
                 symbol_dfs[sym] = df_sym
                 df_last_with_ind = df_sym.tail(1)
                 list_data_last.append((df_last_with_ind, sym))
@@ -122,6 +132,8 @@ def main():
             algo.run(list_data_last, execution=True)
             # Utilisation de la dernière version des colonnes originales
             display_last_indicators_with_state(symbol_dfs, orig_cols, algo)
+            if profiler is not None and now.minute == 0:
+                profiler.print_summary()
             time.sleep(1)
         time.sleep(0.5)
 
@@ -0,0 +1,31 @@
+import pandas as pd
+import CParameterSweep
+
+if __name__ == "__main__":
+    symbols = [
+        "SHIBUSDC",
+        "SOLUSDC",
+    ]
+
+    # Grille de paramètres de CStrat_RSI5min30
+    param_grid = {
+        "max_bars_in_trade": [144, 288, 576],
+        "break_max_timeout_bars": [12, 24, 48],
+        "rsi5m_low": [25, 30],
+        "rsi5m_take_profit": [60, 65],
+        "pullback_ratio": [0.98, 0.985, 0.99],
+    }
+
+    sweep = CParameterSweep.CParameterSweep(
+        strategy_name="RSI5min30",
+        initial_usdc=1000,
+        trading_fee_rate=0.000,
+        risk_per_trade_pct=1,
+        n_workers=None  # None -> un processus par cœur
+    )
+
+    table = sweep.run_files(symbols, param_grid)
+
+    pd.set_option("display.width", 200)
+    print(table.head(20).to_string())
+    table.to_csv("sweep_results.csv", index=False)
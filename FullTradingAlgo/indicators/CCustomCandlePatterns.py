@@ -0,0 +1,116 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+class Candle(namedtuple("Candle", ["open", "high", "low", "close"])):
+    """Tableaux OHLC d'une bougie décalée (NaN quand elle n'existe pas, en début de série)."""
+
+    @property
+    def body(self):
+        return np.abs(self.close - self.open)
+
+    @property
+    def range(self):
+        return self.high - self.low
+
+    @property
+    def bullish(self):
+        return self.close > self.open
+
+    @property
+    def bearish(self):
+        return self.close < self.open
+
+    def small_body(self, max_ratio=0.3):
+        """Petit corps (doji / toupie) : corps <= max_ratio * (high - low), range non nul."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.range != 0) & (self.body / self.range <= max_ratio)
+
+
+class CCustomCandlePatterns:
+    """
+    Patterns de bougies personnalisés, vectorisés sur les tableaux OHLC (signal +1 / -1 / 0).
+
+    Bougie avec un NaN (open, high, low ou close) : toute comparaison est fausse, donc aucun
+    pattern ne la contient. L'ancienne boucle de morning_star faisait l'inverse sur ses tests
+    « continue si ... » et pouvait signaler un pattern ; CJapanesePatternDetector ne passe que
+    des bougies agrégées sans NaN (resample_ohlcv(...).dropna()), où les deux coïncident.
+    """
+
+    @staticmethod
+    def shift(values, k):
+        """values[i - k] en position i (NaN pour i < k)."""
+        out = np.full(len(values), np.nan)
+        if k < len(values):
+            out[k:] = values[:len(values) - k]
+        return out
+
+    @staticmethod
+    def candles(df, n):
+        """
+        Les n bougies qui se terminent en chaque position, de la plus ancienne à la plus récente :
+        [bougie i-n+1, ..., bougie i], chacune sous forme de tableaux décalés.
+        """
+        ohlc = [df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close")]
+        return [Candle(*(CCustomCandlePatterns.shift(values, k) for values in ohlc)) for k in range(n - 1, -1, -1)]
+
+    @staticmethod
+    def morning_star(df):
+        """
+        Morning Star personnalisé (+1) :
+        - Bougie 1 : baissière
+        - Bougie 2 : petite (doji ou toupie)
+        - Bougie 3 : haussière, clôture au-dessus du milieu du corps de B1
+        - Pas d'exigence de gap
+        - La bougie 3 peut englober la bougie 1
+        - Bougie NaN : jamais de signal (cf. docstring de la classe)
+        """
+        b1, b2, b3 = CCustomCandlePatterns.candles(df, 3)
+        midpoint_b1 = b1.open - np.abs(b1.open - b1.close) / 2
+        found = b1.bearish & b2.small_body() & b3.bullish & (b3.close >= midpoint_b1)
+        return np.where(found, 1, 0)
+
+    @staticmethod
+    def evening_star(df):
+        """Evening Star (-1), symétrique du Morning Star : haussière, petite, baissière sous le milieu de B1."""
+        b1, b2, b3 = CCustomCandlePatterns.candles(df, 3)
+        midpoint_b1 = b1.open + np.abs(b1.open - b1.close) / 2
+        found = b1.bullish & b2.small_body() & b3.bearish & (b3.close <= midpoint_b1)
+        return np.where(found, -1, 0)
+
+    @staticmethod
+    def engulfing(df):
+        """Avalement : +1 si une bougie haussière englobe le corps baissier précédent, -1 dans l'autre sens."""
+        b1, b2 = CCustomCandlePatterns.candles(df, 2)
+        bullish = b1.bearish & b2.bullish & (b2.open <= b1.close) & (b2.close >= b1.open)
+        bearish = b1.bullish & b2.bearish & (b2.open >= b1.close) & (b2.close <= b1.open)
+        return np.where(bullish, 1, np.where(bearish, -1, 0))
+
+    @staticmethod
+    def three_soldiers_crows(df):
+        """
+        +1 : trois soldats blancs (3 haussières, closes croissants, chaque ouverture dans le corps précédent)
+        -1 : trois corbeaux noirs (symétrique)
+        """
+        b1, b2, b3 = CCustomCandlePatterns.candles(df, 3)
+        soldiers = (b1.bullish & b2.bullish & b3.bullish
+                    & (b2.close > b1.close) & (b3.close > b2.close)
+                    & (b2.open >= b1.open) & (b2.open <= b1.close)
+                    & (b3.open >= b2.open) & (b3.open <= b2.close))
+        crows = (b1.bearish & b2.bearish & b3.bearish
+                 & (b2.close < b1.close) & (b3.close < b2.close)
+                 & (b2.open <= b1.open) & (b2.open >= b1.close)
+                 & (b3.open <= b2.open) & (b3.open >= b2.close))
+        return np.where(soldiers, 1, np.where(crows, -1, 0))
+
+
+# Patterns personnalisés utilisables comme `pattern_name` de CJapanesePatternDetector.
+# CDLMORNINGSTAR reste notre version (et non celle de TA-Lib), comme historiquement.
+CUSTOM_PATTERNS = {
+    "CDLMORNINGSTAR": CCustomCandlePatterns.morning_star,
+    "CUSTOM_MORNINGSTAR": CCustomCandlePatterns.morning_star,
+    "CUSTOM_EVENINGSTAR": CCustomCandlePatterns.evening_star,
+    "CUSTOM_ENGULFING": CCustomCandlePatterns.engulfing,
+    "CUSTOM_3SOLDIERS_CROWS": CCustomCandlePatterns.three_soldiers_crows,
+}
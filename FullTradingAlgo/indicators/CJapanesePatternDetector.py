@@ -1,10 +1,44 @@
+import numpy as np
 import pandas as pd
-import talib
+
+from CCustomCandlePatterns import CUSTOM_PATTERNS
+
+def resample_ohlcv(df, timeframe):
+    """Bougies agrégées au timeframe (périodes incomplètes en NaN retirées)."""
+    return df.resample(timeframe).agg({
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum"
+    }).dropna()
+
+
+def bucket_positions(index, buckets, timeframe):
+    """
+    Pour chaque bougie de `index`, position de sa bougie agrégée [ts, ts + timeframe - 1min]
+    dans `buckets`, -1 si elle n'appartient à aucune (index trié supposé).
+    """
+    pos = buckets.searchsorted(index, side="right") - 1
+    if not len(buckets):
+        return pos
+    bucket_end = buckets + pd.Timedelta(seconds=pd.Timedelta(timeframe).total_seconds() - 60)
+    in_bucket = (pos >= 0) & np.asarray(index <= bucket_end[np.maximum(pos, 0)])
+    return np.where(in_bucket, pos, -1)
+
+
+def inject(values, pos):
+    """Valeurs des bougies agrégées recopiées sur les bougies fines (0 hors bougie agrégée)."""
+    if not len(values):
+        return np.zeros(len(pos), dtype=np.int64)
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], 0)
+
 
 class CJapanesePatternDetector:
     def __init__(self, pattern_name, timeframe="5min", pct_threshold=0.3, output_col_name="jap_pattern"):
         """
-        :param pattern_name: Nom de la fonction TA-Lib, ex: 'CDLHAMMER', 'CDLINVERTEDHAMMER'
+        :param pattern_name: Nom de la fonction TA-Lib, ex: 'CDLHAMMER', 'CDLINVERTEDHAMMER',
+                             ou d'un pattern personnalisé de CCustomCandlePatterns.CUSTOM_PATTERNS
         :param timeframe: Résolution temporelle pour le resampling (ex: '5min', '15min', etc.)
         :param pct_threshold: Seuil en pourcentage pour filtrer (ex: 0.3 pour 0.3%)
         :param output_col_name: Nom de la colonne finale à injecter dans le df initial
@@ -14,7 +48,9 @@ class CJapanesePatternDetector:
         self.pct_threshold = pct_threshold / 100.0
         self.output_col_name = output_col_name
 
-        if self.pattern_name != "CDLMORNINGSTAR":
+        if self.pattern_name not in CUSTOM_PATTERNS:
+            # TA-Lib seulement pour ses patterns : patterns personnalisés et fonctions du module sans TA-Lib
+            import talib
             if not hasattr(talib, self.pattern_name):
                 raise ValueError(f"Le pattern '{self.pattern_name}' n'existe pas dans TA-Lib.")
             self.talib_func = getattr(talib, self.pattern_name)
@@ -24,84 +60,42 @@ class CJapanesePatternDetector:
         Applique la détection du pattern et filtre selon le seuil.
         Injecte le résultat dans le df original avec la bonne granularité.
         """
-        df_resampled = df.resample(self.timeframe).agg({
-            "open": "first",
-            "high": "max",
-            "low": "min",
-            "close": "last",
-            "volume": "sum"
-        }).dropna()
+        df_resampled = resample_ohlcv(df, self.timeframe)
 
         signal_col = f"{self.pattern_name.lower()}_signal"
+        df_resampled[signal_col] = self.signal(df_resampled)
+        filtered = self.filter(df_resampled[signal_col].to_numpy(), df_resampled)
 
-        if self.pattern_name == "CDLMORNINGSTAR":
-            # Appel de la version personnalisée du Morning Star
-            df_resampled[signal_col] = self._detect_custom_morning_star(df_resampled)
-        else:
-            # Appel TA-Lib pour les autres patterns
-            pattern_series = self.talib_func(
-                df_resampled["open"],
-                df_resampled["high"],
-                df_resampled["low"],
-                df_resampled["close"]
-            )
-            df_resampled[signal_col] = pattern_series.apply(lambda x: 1 if x > 0 else (-1 if x < 0 else 0))
-
-        # Filtrage basé sur un seuil de variation
-        df_resampled["filtered"] = 0
-        for idx, row in df_resampled.iterrows():
-            signal = row[signal_col]
-            if signal == 1:
-                if row["low"] > 0 and (row["close"] - row["low"]) / row["low"] >= self.pct_threshold:
-                    df_resampled.at[idx, "filtered"] = 1
-            elif signal == -1:
-                if row["close"] > 0 and (row["high"] - row["close"]) / row["close"] >= self.pct_threshold:
-                    df_resampled.at[idx, "filtered"] = -1
-
-        # Injection dans df initial (bougies plus fines)
-        df[self.output_col_name] = 0
-        for ts, signal in df_resampled["filtered"].items():
-            ts_end = ts + pd.Timedelta(seconds=pd.Timedelta(self.timeframe).total_seconds() - 60)
-            df.loc[ts:ts_end, self.output_col_name] = signal
+        # Injection dans df initial (bougies plus fines) : chaque bougie reçoit le signal de sa
+        # bougie agrégée, 0 ailleurs
+        df[self.output_col_name] = inject(filtered, bucket_positions(df.index, df_resampled.index, self.timeframe))
 
         return df
 
-    def _detect_custom_morning_star(self, df):
+    def signal(self, df_resampled, ohlc=None):
         """
-        Morning Star personnalisé :
-        - Bougie 1 : baissière
-        - Bougie 2 : petite (doji ou toupie)
-        - Bougie 3 : haussière, clôture au-dessus du milieu du corps de B1
-        - Pas d'exigence de gap
-        - La bougie 3 peut englober la bougie 1
+        Signal brut (+1 / -1 / 0) sur les bougies agrégées.
+        :param ohlc: tableaux float (open, high, low, close) déjà extraits, partagés entre patterns
         """
-        result = pd.Series(0, index=df.index)
+        if self.pattern_name in CUSTOM_PATTERNS:
+            # Patterns personnalisés (dont notre Morning Star), vectorisés
+            return CUSTOM_PATTERNS[self.pattern_name](df_resampled)
+
+        # Appel TA-Lib pour les autres patterns
+        if ohlc is None:
+            ohlc = (df_resampled["open"], df_resampled["high"], df_resampled["low"], df_resampled["close"])
+        return np.sign(np.asarray(self.talib_func(*ohlc), dtype=np.int64))
+
+    def filter(self, signal, df_resampled):
+        """Filtrage basé sur un seuil de variation : signal conservé si la mèche dépasse pct_threshold."""
+        high = df_resampled["high"].to_numpy(dtype=float)
+        low = df_resampled["low"].to_numpy(dtype=float)
+        close = df_resampled["close"].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep_up = (signal == 1) & (low > 0) & ((close - low) / low >= self.pct_threshold)
+            keep_down = (signal == -1) & (close > 0) & ((high - close) / close >= self.pct_threshold)
+        return np.where(keep_up, 1, np.where(keep_down, -1, 0))
 
-        for i in range(2, len(df)):
-            o1, c1 = df.iloc[i-2]["open"], df.iloc[i-2]["close"]
-            o2, c2 = df.iloc[i-1]["open"], df.iloc[i-1]["close"]
-            o3, c3 = df.iloc[i]["open"], df.iloc[i]["close"]
-
-            # Bougie 1 : baissière
-            if c1 >= o1:
-                continue
-
-            # Bougie 2 : petit corps (indécision)
-            body2 = abs(c2 - o2)
-            range2 = df.iloc[i-1]["high"] - df.iloc[i-1]["low"]
-            if range2 == 0 or body2 / range2 > 0.3:
-                continue
-
-            # Bougie 3 : haussière
-            if c3 <= o3:
-                continue
-
-            # Clôture de la 3e au-dessus du milieu du corps de la 1ʳᵉ
-            midpoint_b1 = o1 - abs(o1 - c1) / 2
-            if c3 < midpoint_b1:
-                continue
-
-            # Pattern détecté
-            result.iloc[i] = 1
-
-        return result
+    def _detect_custom_morning_star(self, df):
+        """Morning Star personnalisé, cf. CCustomCandlePatterns.morning_star."""
+        return pd.Series(CUSTOM_PATTERNS["CDLMORNINGSTAR"](df), index=df.index)
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from CJapanesePatternDetector import CJapanesePatternDetector, bucket_positions, inject, resample_ohlcv
+
+
+class CMultiPatternDetector:
+    def __init__(self, specs):
+        """
+        Plusieurs patterns (TA-Lib CDL* ou personnalisés) sur plusieurs timeframes en une passe.
+
+        :param specs: liste de (pattern_name, timeframe, pct_threshold, output_col_name), mêmes
+                      paramètres que CJapanesePatternDetector
+
+        Chaque timeframe n'est agrégé qu'une fois : les patterns qui le partagent utilisent les
+        mêmes tableaux OHLC et la même table bougie fine -> bougie agrégée pour l'injection.
+        Les colonnes produites sont identiques à celles de CJapanesePatternDetector.detect_and_filter
+        appelé pattern par pattern, et ajoutées au df en une seule fois.
+        """
+        self.detectors = [CJapanesePatternDetector(pattern_name, timeframe=timeframe,
+                                                   pct_threshold=pct_threshold, output_col_name=output_col_name)
+                          for pattern_name, timeframe, pct_threshold, output_col_name in specs]
+
+    def detect_and_filter(self, df):
+        by_timeframe = {}
+        for detector in self.detectors:
+            by_timeframe.setdefault(detector.timeframe, []).append(detector)
+
+        columns = {}
+        for timeframe, detectors in by_timeframe.items():
+            df_resampled = resample_ohlcv(df, timeframe)
+            ohlc = tuple(df_resampled[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close"))
+            pos = bucket_positions(df.index, df_resampled.index, timeframe)
+            for detector in detectors:
+                filtered = detector.filter(detector.signal(df_resampled, ohlc), df_resampled)
+                columns[detector.output_col_name] = inject(filtered, pos)
+
+        # Une seule copie : les colonnes d'origine + toutes les colonnes de patterns d'un coup
+        existing = [col for col in columns if col in df.columns]
+        base = df.drop(columns=existing) if existing else df
+        return pd.concat([base, pd.DataFrame(columns, index=df.index)], axis=1)
+
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from CRSICalculator import close_rule_step, interpolate_rsi
+
+
+class CMultiRSICalculator:
+    def __init__(self, df, specs, close_at="start"):
+        """
+        Plusieurs RSI (timeframes différents) en une passe et une seule copie du DataFrame.
+
+        :param specs: liste de (timeframe, period, name) ou (timeframe, period, name, close_at), où
+                      timeframe est une période pandas ("5min", "1h", "4h") ou une liste de
+                      (heure, minute) comme `close_times` de CRSICalculator
+        :param close_at: "start" / "end", minute de clôture retenue par défaut pour les périodes
+
+        Pour chaque spec, les colonnes ajoutées sont celles de CRSICalculator, dans le même ordre :
+        avg_gain_<name>, avg_loss_<name>, <name>. Index supposé sans doublons.
+        """
+        self.specs = [tuple(spec) + (close_at,) if len(spec) == 3 else tuple(spec) for spec in specs]
+        self.df = self._compute(df)
+
+    def _compute(self, df):
+        # Communs à tous les timeframes : minute du jour et closes
+        minute_of_day = np.asarray(df.index.hour * 60 + df.index.minute)
+        close = df["close"].to_numpy(dtype=float)
+        n = len(df)
+
+        columns = {}
+        for timeframe, period, name, close_at in self.specs:
+            alpha = 1 / period
+
+            if isinstance(timeframe, str):
+                step, offset = close_rule_step(timeframe, close_at)
+                points = np.flatnonzero(minute_of_day % step == offset)
+            else:
+                points = np.flatnonzero(np.isin(minute_of_day, [h * 60 + m for h, m in timeframe]))
+
+            # Gains / pertes entre points de clôture successifs, moyennes EWM, RSI aux points
+            delta = np.empty(len(points))
+            delta[:1] = np.nan
+            delta[1:] = np.diff(close[points])
+            avg_gain_points = pd.Series(np.maximum(delta, 0)).ewm(alpha=alpha, min_periods=period).mean().to_numpy()
+            avg_loss_points = pd.Series(np.maximum(-delta, 0)).ewm(alpha=alpha, min_periods=period).mean().to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi_points = np.where(avg_loss_points == 0, 100.0,
+                                      100 - (100 / (1 + avg_gain_points / avg_loss_points)))
+
+            avg_gain = np.full(n, np.nan)
+            avg_loss = np.full(n, np.nan)
+            rsi = np.full(n, np.nan)
+            avg_gain[points] = avg_gain_points
+            avg_loss[points] = avg_loss_points
+            rsi[points] = rsi_points
+
+            columns[f"avg_gain_{name}"] = avg_gain
+            columns[f"avg_loss_{name}"] = avg_loss
+            columns[name] = interpolate_rsi(avg_gain, avg_loss, rsi, close, alpha)
+
+        # Seule copie : les colonnes d'origine + toutes les colonnes RSI d'un coup
+        existing = [col for col in columns if col in df.columns]
+        base = df.drop(columns=existing) if existing else df
+        return pd.concat([base, pd.DataFrame(columns, index=df.index)], axis=1)
+
+    def get_df(self):
+        return self.df
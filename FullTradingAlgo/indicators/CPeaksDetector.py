@@ -1,10 +1,37 @@
+import math
+
 import pandas as pd
 import numpy as np
-from scipy.signal import find_peaks
+from scipy.signal import find_peaks, peak_prominences
+
+
+def select_by_peak_distance(peaks, priority, distance):
+    """
+    Sélection par distance de find_peaks : du pic le plus prioritaire (le plus haut) au moins
+    prioritaire, chaque pic conservé élimine ses voisins à moins de `distance` bougies.
+    Même ordre de parcours que scipy (np.argsort par défaut), donc mêmes choix en cas d'égalité.
+    Retourne le masque des pics conservés.
+    """
+    distance = math.ceil(distance)
+    keep = np.ones(len(peaks), dtype=bool)
+    positions = peaks.tolist()
+    for j in np.argsort(priority)[::-1].tolist():
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and positions[j] - positions[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < len(positions) and positions[k] - positions[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
 
 class CPeaksDetector:
     def __init__(self, df, atr_period=14, factor=0.5, distance=5,
-                 max_col="peak_max", min_col="peak_min"):
+                 max_col="peak_max", min_col="peak_min", wlen=None, chunk_size=None):
         """
         Détecteur de pics min/max avec prominence dynamique basée sur l'ATR.
         Les colonnes ajoutées contiennent les valeurs des pics.
@@ -23,13 +50,28 @@ class CPeaksDetector:
             Nom de la colonne pour les maxima
         min_col : str
             Nom de la colonne pour les minima
+        wlen : int | None
+            Fenêtre (en bougies) de calcul de la prominence, cf. scipy.signal.find_peaks.
+            None = toute la série (comportement historique)
+        chunk_size : int | None
+            Mode par blocs, mémoire bornée pour des mois de bougies 1m : maxima locaux puis
+            prominences calculés bloc par bloc (blocs de `chunk_size` bougies élargis de
+            `wlen + distance` de chaque côté), la sélection par distance de find_peaks restant
+            faite sur l'ensemble des pics (tableau d'indices seulement). Nécessite `wlen`.
+            Résultat identique au calcul d'un seul tenant avec le même `wlen`, sauf plateau
+            (valeurs égales consécutives) plus long que la marge à cheval sur deux blocs.
+            Sans `wlen`, la prominence dépend de toute la série : pas de découpage possible.
         """
+        if chunk_size is not None and wlen is None:
+            raise ValueError("Le mode par blocs (chunk_size) nécessite une fenêtre de prominence wlen.")
         self.df = df.copy()
         self.atr_period = atr_period
         self.factor = factor
         self.distance = distance
         self.max_col = max_col
         self.min_col = min_col
+        self.wlen = wlen
+        self.chunk_size = chunk_size
         self._compute_peaks()
 
     def _compute_peaks(self):
@@ -40,16 +82,11 @@ class CPeaksDetector:
 
         highs = df['high'].values
         lows = df['low'].values
+        atr = df['atr'].to_numpy(dtype=float)
 
-        # Détection brute sans filtrage de prominence
-        peaks_max, props_max = find_peaks(highs, distance=self.distance, prominence=0)
-        peaks_min, props_min = find_peaks(-lows, distance=self.distance, prominence=0)
-
-        # Post-filtrage dynamique selon ATR locale
-        filtered_max = [i for i in peaks_max
-                        if props_max["prominences"][list(peaks_max).index(i)] >= self.factor * df['atr'].iloc[i]]
-        filtered_min = [i for i in peaks_min
-                        if props_min["prominences"][list(peaks_min).index(i)] >= self.factor * df['atr'].iloc[i]]
+        # Détection brute puis post-filtrage dynamique selon ATR locale
+        filtered_max = self._find_peaks(highs, atr)
+        filtered_min = self._find_peaks(-lows, atr)
 
         # Colonnes pour stocker les valeurs des pics
         df[self.max_col] = np.nan
@@ -63,6 +100,37 @@ class CPeaksDetector:
 
         self.df = df
 
+    def _find_peaks(self, values, atr):
+        """Positions des pics de `values` dont la prominence est >= factor * ATR locale."""
+        n = len(values)
+        if self.chunk_size is None or n <= self.chunk_size:
+            peaks, props = find_peaks(values, distance=self.distance, prominence=0, wlen=self.wlen)
+            return peaks[props["prominences"] >= self.factor * atr[peaks]]
+
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        margin = self.wlen + self.distance
+        chunks = [(start, min(start + self.chunk_size, n)) for start in range(0, n, self.chunk_size)]
+
+        # 1. Maxima locaux, bloc par bloc
+        peaks = []
+        for start, end in chunks:
+            lo, hi = max(0, start - margin), min(n, end + margin)
+            local = find_peaks(values[lo:hi])[0] + lo
+            peaks.append(local[(local >= start) & (local < end)])
+        peaks = np.concatenate(peaks).astype(np.intp)
+
+        # 2. Distance minimale entre pics : même sélection (par hauteur) que find_peaks
+        peaks = peaks[select_by_peak_distance(peaks, values[peaks], self.distance)]
+
+        # 3. Prominences dans la fenêtre wlen, bloc par bloc, puis filtrage ATR
+        kept = []
+        for start, end in chunks:
+            lo, hi = max(0, start - margin), min(n, end + margin)
+            chunk_peaks = peaks[(peaks >= start) & (peaks < end)]
+            prominences = peak_prominences(values[lo:hi], chunk_peaks - lo, wlen=self.wlen)[0]
+            kept.append(chunk_peaks[prominences >= self.factor * atr[chunk_peaks]])
+        return np.concatenate(kept)
+
     def get_df(self):
         """Retourne le DataFrame enrichi avec colonnes des valeurs des pics"""
         return self.df
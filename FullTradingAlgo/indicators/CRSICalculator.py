@@ -1,13 +1,70 @@
+import numpy as np
 import pandas as pd
 
+def close_rule_step(rule, close_at="start"):
+    """(pas, décalage) en minutes d'une période pandas qui divise la journée ("5min", "4h"...)."""
+    step = pd.Timedelta(rule).total_seconds() / 60
+    if step < 1 or step != int(step) or (24 * 60) % step != 0:
+        raise ValueError(f"La période '{rule}' doit être un nombre entier de minutes qui divise 24h")
+    if close_at not in ("start", "end"):
+        raise ValueError(f"close_at doit valoir 'start' ou 'end', pas '{close_at}'")
+    step = int(step)
+    return step, (0 if close_at == "start" else step - 1)
+
+
+def close_mask(index, close_times=None, rule=None, close_at="start"):
+    """Masque des bougies de clôture d'un DatetimeIndex (close_times ou rule, cf. CRSICalculator)."""
+    minute_of_day = np.asarray(index.hour * 60 + index.minute)
+    if rule is None:
+        return np.isin(minute_of_day, [h * 60 + m for h, m in close_times])
+    step, offset = close_rule_step(rule, close_at)
+    return minute_of_day % step == offset
+
+
+def interpolate_rsi(avg_gain, avg_loss, rsi_points, close, alpha):
+    """
+    RSI minute par minute à partir des moyennes aux points de clôture (NaN ailleurs).
+    Entre deux points : dernières moyennes et dernier close du point précédent (forward-fill
+    par position, y compris si ce close est NaN), puis un pas d'EMA avec la variation courante.
+    Aux points : `rsi_points`. Avant le premier point défini : NaN.
+    """
+    is_point = ~np.isnan(avg_gain) & ~np.isnan(avg_loss)
+    last = np.maximum.accumulate(np.where(is_point, np.arange(len(close)), -1))
+    seen = last >= 0
+    last = np.where(seen, last, 0)
+
+    delta = close - close[last]
+    gain_avg = (1 - alpha) * avg_gain[last] + alpha * np.maximum(delta, 0)
+    loss_avg = (1 - alpha) * avg_loss[last] + alpha * np.maximum(-delta, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(loss_avg != 0, 100 - (100 / (1 + gain_avg / loss_avg)), 100.0)
+
+    rsi = np.where(is_point, rsi_points, rsi)
+    rsi[~seen] = np.nan
+    return rsi
+
+
 class CRSICalculator:
-    def __init__(self, df, period=14, close_times=[(3, 59), (7, 59), (11, 59), (15, 59), (19, 59), (23, 59)], name="rsi"):
+    def __init__(self, df, period=14, close_times=[(3, 59), (7, 59), (11, 59), (15, 59), (19, 59), (23, 59)], name="rsi",
+                 rule=None, close_at="start"):
+        """
+        Points de clôture : soit `close_times` (liste de (heure, minute)), soit `rule`, une période
+        pandas qui divise la journée ("5min", "1h", "4h"...). Avec `rule`, `close_at` choisit la
+        minute retenue dans chaque période : "start" (ex: 4h -> 00:00, 04:00...) ou "end"
+        (ex: 4h -> 03:59, 07:59...), ce qui couvre les listes utilisées par les stratégies.
+        """
         self.df = df.copy()
         self.period = period
         self.close_times = close_times  # List of (hour, minute)
         self.name = name
+        self.rule = rule
+        self.close_at = close_at
         self._compute_rsi()
 
+    def _close_mask(self, index):
+        """Masque des bougies de clôture, par arithmétique sur la minute du jour."""
+        return close_mask(index, self.close_times, self.rule, self.close_at)
+
     def _compute_rsi(self):
         df = self.df
 
@@ -23,12 +80,10 @@ class CRSICalculator:
         alpha = 1 / period
 
         # 1. Marquer les timestamps correspondant aux clôtures voulues
-        df['is_custom_close'] = df.index.map(
-            lambda x: (x.hour, x.minute) in self.close_times
-        )
+        is_custom_close = self._close_mask(df.index)
 
         # 2. Extraire les closes aux bons moments
-        df_close = df[df['is_custom_close']].copy()
+        df_close = df.loc[is_custom_close, ['close']].copy()
         # nb_nan = df_close['close'].isna().sum()
         # last_value = df_close['close'].iloc[-1]
         # prev_value = df_close['close'].iloc[-2]
@@ -38,8 +93,8 @@ class CRSICalculator:
         # print("Dernière valeur :", prev_value)
 
         df_close['delta'] = df_close['close'].diff()
-        df_close['gain'] = df_close['delta'].apply(lambda x: max(x, 0))
-        df_close['loss'] = df_close['delta'].apply(lambda x: max(-x, 0))
+        df_close['gain'] = np.maximum(df_close['delta'], 0)
+        df_close['loss'] = np.maximum(-df_close['delta'], 0)
 
         # 3. Moyenne EMA
         df_close[f'avg_gain_{self.name}'] = df_close['gain'].ewm(alpha=alpha, min_periods=period).mean()
@@ -48,16 +103,11 @@ class CRSICalculator:
         # nb_nan = df_close[f'avg_gain_{self.name}'].isna().sum()
         # print("Nombre de NaN :", nb_nan)
 
-        # 4. Calcul du RSI sur ces points
-        def compute_rsi(gain, loss):
-            if loss == 0:
-                return 100
-            rs = gain / loss
-            return 100 - (100 / (1 + rs))
-
-        df_close[self.name] = df_close.apply(
-            lambda row: compute_rsi(row[f'avg_gain_{self.name}'], row[f'avg_loss_{self.name}']), axis=1
-        )
+        # 4. Calcul du RSI sur ces points (100 si aucune perte moyenne)
+        gain = df_close[f'avg_gain_{self.name}'].to_numpy()
+        loss = df_close[f'avg_loss_{self.name}'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df_close[self.name] = np.where(loss == 0, 100.0, 100 - (100 / (1 + gain / loss)))
 
         # 5. Fusion avec df original
         df = df.merge(
@@ -67,69 +117,14 @@ class CRSICalculator:
             right_index=True
         )
 
-        # 6. Interpolation minute par minute avec trace NaN
-        gain_filled = []
-        loss_filled = []
-        rsi_filled = []
-
-        last_idx = None
-        next_idx = None
-        last_gain = None
-        last_loss = None
-        last_price = None
-
-        for idx in df.index:
-            gain = df.at[idx, f'avg_gain_{self.name}']
-            loss = df.at[idx, f'avg_loss_{self.name}']
-
-            if pd.notna(gain) and pd.notna(loss):
-                last_gain = gain
-                last_loss = loss
-                last_idx = idx
-                last_price = df.at[idx, 'close']
-                rsi = df.at[idx, self.name]
-            elif last_idx is not None:
-                if next_idx is None or idx >= next_idx:
-                    future = df.loc[idx:].dropna(subset=[f'avg_gain_{self.name}'])
-                    if not future.empty:
-                        next_idx = future.index[0]
-                    else:
-                        next_idx = None
-
-                if next_idx is not None:
-                    total_steps = (next_idx - last_idx).total_seconds() / 60
-                    cur_steps = (idx - last_idx).total_seconds() / 60
-
-                    weight_cur = cur_steps / total_steps
-                    weight_last = 1 - weight_cur
-
-                    close_cur = df.at[idx, 'close']
-                    delta = close_cur - last_price
-                    gain_cur = max(delta, 0)
-                    loss_cur = max(-delta, 0)
-
-                    gain_avg = (1 - alpha) * last_gain + alpha * gain_cur
-                    loss_avg = (1 - alpha) * last_loss + alpha * loss_cur
-
-                    rsi = 100 - (100 / (1 + gain_avg / loss_avg)) if loss_avg != 0 else 100
-                else:
-                    close_cur = df.at[idx, 'close']
-                    delta = close_cur - last_price
-                    gain_cur = max(delta, 0)
-                    loss_cur = max(-delta, 0)
-
-                    gain_avg = (1 - alpha) * last_gain + alpha * gain_cur
-                    loss_avg = (1 - alpha) * last_loss + alpha * loss_cur
-
-                    rsi = 100 - (100 / (1 + gain_avg / loss_avg)) if loss_avg != 0 else 100
-            else:
-                rsi = None
-
-            gain_filled.append(last_gain if last_gain is not None else None)
-            loss_filled.append(last_loss if last_loss is not None else None)
-            rsi_filled.append(rsi)
-
-        df[self.name] = rsi_filled
+        # 6. Interpolation minute par minute (vectorisée)
+        df[self.name] = interpolate_rsi(
+            df[f'avg_gain_{self.name}'].to_numpy(dtype=float),
+            df[f'avg_loss_{self.name}'].to_numpy(dtype=float),
+            df[self.name].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float),
+            alpha
+        )
         
         # nb_nan = df[self.name].isna().sum()
         # last_value = df[self.name].iloc[-1]
@@ -158,7 +153,7 @@ class CRSICalculator:
         #     print(start, "→", end)
 
 
-        self.df = df.drop(columns=['is_custom_close'])
+        self.df = df
 
     def get_df(self):
         return self.df
@@ -0,0 +1,29 @@
+import pandas as pd
+
+
+class CRollingOHLC:
+    """Bougies OHLC glissantes sur les minutes (sans resample), et dérivés (Heikin-Ashi)."""
+
+    @staticmethod
+    def rolling_ohlc(df, window):
+        """
+        Bougie OHLC glissante sur les `window` dernières bougies, en chaque position :
+        open = open de la première bougie de la fenêtre, high = max, low = min, close = close courant.
+
+        Mêmes valeurs que rolling(window).apply(lambda x: x.iloc[0]) / .max() / .min() /
+        .apply(lambda x: x.iloc[-1]) : NaN tant que la fenêtre n'est pas complète ou si elle
+        contient un NaN (min_periods = window), mais sans appel Python par bougie.
+        """
+        full = {col: df[col].rolling(window).count() == window for col in ("open", "close")}
+        return pd.DataFrame({
+            "open": df["open"].shift(window - 1).where(full["open"]).astype(float),
+            "high": df["high"].rolling(window).max(),
+            "low": df["low"].rolling(window).min(),
+            "close": df["close"].where(full["close"]).astype(float),
+        }, index=df.index)
+
+    @staticmethod
+    def heikin_ashi_close(df, window):
+        """Close Heikin-Ashi de la bougie glissante de `window` minutes : (open + high + low + close) / 4."""
+        ohlc = CRollingOHLC.rolling_ohlc(df, window)
+        return (ohlc["open"] + ohlc["high"] + ohlc["low"] + ohlc["close"]) / 4
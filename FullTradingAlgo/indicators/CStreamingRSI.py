@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+
+from CRSICalculator import close_mask, close_rule_step
+
+
+class CStreamingRSI:
+    """
+    RSI incrémental pour la production : mêmes calculs que CRSICalculator, une bougie à la fois.
+
+    - aux points de clôture (close_times ou rule/close_at, comme CRSICalculator) : moyennes
+      EWM des gains/pertes avec la récurrence exacte de pandas (ewm(alpha=1/period, adjust=True,
+      min_periods=period)), puis RSI du point
+    - entre deux points : un pas d'EMA depuis les moyennes et le close du dernier point
+
+    `update` est en O(1) ; les valeurs sont identiques (à l'arrondi flottant près) à la colonne
+    que produirait CRSICalculator sur toutes les bougies reçues depuis `seed`.
+    """
+
+    def __init__(self, period=14, close_times=[(3, 59), (7, 59), (11, 59), (15, 59), (19, 59), (23, 59)],
+                 name="rsi", rule=None, close_at="start"):
+        self.period = period
+        self.alpha = 1 / period
+        self.close_times = close_times
+        self.name = name
+        self.rule = rule
+        self.close_at = close_at
+        if rule is None:
+            self._close_minutes = {h * 60 + m for h, m in close_times}
+        else:
+            self._step, self._offset = close_rule_step(rule, close_at)
+        self.reset()
+
+    def reset(self):
+        # État des deux EWM (récurrence de pandas) sur les points de clôture
+        self._gain_ewm = math.nan
+        self._loss_ewm = math.nan
+        self._old_weight = 1.0
+        self._nobs = 0
+        self._prev_point_close = math.nan   # close du point précédent (pour le delta)
+        self._has_prev_point = False
+
+        # Dernier point où les moyennes sont définies
+        self.avg_gain = None
+        self.avg_loss = None
+        self.point_close = None
+        self.rsi_close = math.nan
+
+        self.rsi = math.nan
+        self.last_timestamp = None
+
+    def is_close(self, timestamp):
+        minute = timestamp.hour * 60 + timestamp.minute
+        if self.rule is None:
+            return minute in self._close_minutes
+        return minute % self._step == self._offset
+
+    def _push_close(self, close):
+        """Nouveau point de clôture : une étape des deux EWM."""
+        delta = close - self._prev_point_close if self._has_prev_point else math.nan
+        self._prev_point_close = close
+        self._has_prev_point = True
+
+        is_observation = delta == delta
+        self._nobs += is_observation
+        if self._gain_ewm == self._gain_ewm:
+            self._old_weight *= 1 - self.alpha
+            if is_observation:
+                gain, loss = max(delta, 0), max(-delta, 0)
+                if self._gain_ewm != gain:
+                    self._gain_ewm = (self._old_weight * self._gain_ewm + gain) / (self._old_weight + 1.0)
+                if self._loss_ewm != loss:
+                    self._loss_ewm = (self._old_weight * self._loss_ewm + loss) / (self._old_weight + 1.0)
+                self._old_weight += 1.0
+        elif is_observation:
+            self._gain_ewm = max(delta, 0)
+            self._loss_ewm = max(-delta, 0)
+
+        if self._nobs >= self.period:
+            self.avg_gain = self._gain_ewm
+            self.avg_loss = self._loss_ewm
+            self.point_close = close
+            self.rsi_close = 100.0 if self.avg_loss == 0 else 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+            return True
+        return False
+
+    def update(self, timestamp, close):
+        """Ajoute une bougie clôturée et retourne le RSI de cette bougie (NaN avant le premier point)."""
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(f"Bougie {timestamp} non postérieure à la précédente ({self.last_timestamp})")
+        self.last_timestamp = timestamp
+
+        if self.is_close(timestamp) and self._push_close(close):
+            self.rsi = self.rsi_close
+        elif self.avg_gain is not None:
+            alpha = self.alpha
+            delta = close - self.point_close
+            gain_avg = (1 - alpha) * self.avg_gain + alpha * max(delta, 0)
+            loss_avg = (1 - alpha) * self.avg_loss + alpha * max(-delta, 0)
+            self.rsi = 100.0 if loss_avg == 0 else 100 - (100 / (1 + gain_avg / loss_avg))
+        return self.rsi
+
+    def seed(self, df):
+        """
+        Amorce l'état sur un historique (index DatetimeIndex strictement croissant, colonne
+        'close') : seuls les points de clôture sont parcourus, puis la dernière bougie fixe `rsi`.
+        """
+        if not (df.index.is_monotonic_increasing and df.index.is_unique):
+            raise ValueError("L'historique doit avoir un index strictement croissant (trier et dédoublonner)")
+        self.reset()
+        if df.empty:
+            return self
+        closes = df["close"].to_numpy(dtype=float)
+        points = np.flatnonzero(close_mask(df.index, self.close_times, self.rule, self.close_at))
+        for k in points[:-1] if len(points) and points[-1] == len(df) - 1 else points:
+            self._push_close(float(closes[k]))
+        # La dernière bougie passe par update pour fixer `rsi` (point ou intra-période)
+        self.update(df.index[-1], float(closes[-1]))
+        return self
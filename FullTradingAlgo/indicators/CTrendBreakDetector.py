@@ -1,17 +1,115 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from scipy import stats
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Nombre max de valeurs (fenêtres x window) traitées à la fois pour le test "fenêtre clean"
+BLOCK_ELEMENTS = 2 ** 20
+
+# detect_breaks_grid : répartition sur plusieurs processus au-delà de bougies x couples de la grille
+PARALLEL_MIN_ELEMENTS = 5_000_000
+
+# Fenêtre plate : écart-type des résidus <= FLAT_RTOL * |prix moyen| -> signal NaN (IC dégénéré)
+FLAT_RTOL = 1e-9
+
+
+def segment_sums(y, lo, hi):
+    """
+    Sommes cumulées de y[lo:hi] pour les régressions glissantes du segment, recentrées pour la
+    précision : valeurs moins la première valeur définie (ref), positions relatives à `lo`.
+    Les NaN comptent pour 0 dans les sommes et sont comptés à part.
+    Retourne (lo, ref, yc, P0, P1, PN) avec yc = y[lo:hi] - ref (NaN conservés).
+    """
+    yc = y[lo:hi]
+    nan = np.isnan(yc)
+    valid = np.flatnonzero(~nan)
+    ref = yc[valid[0]] if len(valid) else 0.0
+    yc = yc - ref
+    filled = np.where(nan, 0.0, yc)
+    zero = np.zeros(1)
+    P0 = np.concatenate([zero, np.cumsum(filled)])
+    P1 = np.concatenate([zero, np.cumsum(np.arange(len(yc)) * filled)])
+    PN = np.concatenate([[0], np.cumsum(nan)])
+    return lo, ref, yc, P0, P1, PN
+
+
+def break_signals(sums, highs, lows, start, stop, window, t_val):
+    """
+    Signaux des bougies i de [start, stop) pour des régressions sur les `window` points
+    précédents, à partir des sommes d'un segment qui couvre [start - window, stop).
+    """
+    lo, ref, yc, P0, P1, PN = sums
+    s = np.arange(start, stop) - window - lo   # début de chaque fenêtre, relatif au segment
+    e = s + window
+
+    # Régression des moindres carrés glissante (x local = 0..window-1) par sommes cumulées
+    mean_u = (window - 1) / 2
+    Suu = window * (window * window - 1) / 12
+    Sy = P0[e] - P0[s]
+    Suy = (P1[e] - P1[s]) - s * Sy
+    slope = (Suy - mean_u * Sy) / Suu
+    intercept = Sy / window - slope * mean_u
+    has_nan = (PN[e] - PN[s]) > 0
+    slope[has_nan] = np.nan
+    intercept[has_nan] = np.nan
+
+    # Intervalle de prédiction : seul l'écart-type des résidus dépend de la fenêtre
+    u = np.arange(window)
+    spread = np.sqrt(1 + 1 / window + (u - mean_u) ** 2 / Suu)
+    spread_last = np.sqrt(1 + 1 / window + (window - mean_u) ** 2 / Suu)
+
+    Y = sliding_window_view(yc, window)[s]
+    y_fit = intercept[:, None] + slope[:, None] * u
+    se = np.std(Y - y_fit, axis=1, ddof=2)
+    margin = t_val * se[:, None] * spread
+
+    # Fenêtre non clean si un point sort de son IC prédictif (comparaisons fausses si NaN).
+    # Fenêtre plate (résidus nuls à l'arrondi près) : IC de largeur nulle, non clean elle aussi
+    # (la boucle linregress d'origine n'y donnait un signal qu'au gré des arrondis)
+    dirty = ((Y < y_fit - margin) | (Y > y_fit + margin)).any(axis=1)
+    dirty |= se <= FLAT_RTOL * np.abs(Sy / window + ref)
+
+    # Tester la dernière bougie
+    y_pred = intercept + slope * window + ref
+    margin_last = t_val * se * spread_last
+    signals = np.where(highs[start:stop] > y_pred + margin_last, 1.0,
+                       np.where(lows[start:stop] < y_pred - margin_last, -1.0, 0.0))
+    signals[dirty] = np.nan
+    return signals
+
+
+def grid_signals(highs, lows, start, stop, grid):
+    """
+    Signaux des bougies [start, stop) pour chaque (window, t_val) de `grid` (tableau
+    len(grid) x (stop - start), NaN avant la première fenêtre complète). Les sommes cumulées
+    d'un bloc de bougies sont calculées une fois et partagées par toute la grille.
+    """
+    avg_price = (highs + lows) / 2
+    max_window = max(window for window, _ in grid)
+    results = np.full((len(grid), stop - start), np.nan)
+    block = max(1, BLOCK_ELEMENTS // max_window)
+    for b0 in range(start, stop, block):
+        b1 = min(b0 + block, stop)
+        sums = segment_sums(avg_price, max(0, b0 - max_window), b1)
+        for k, (window, t_val) in enumerate(grid):
+            first = max(b0, window)
+            if first < b1:
+                results[k, first - start:b1 - start] = break_signals(sums, highs, lows, first, b1, window, t_val)
+    return results
+
+
+def _grid_shard(task):
+    """Exécuté dans un processus du pool : une tranche de bougies (et son historique) pour toute la grille."""
+    return grid_signals(task["highs"], task["lows"], task["start"], task["stop"], task["grid"])
+
 
 class CTrendBreakDetector:
     def __init__(self):
         pass
 
-    def _compute_prediction_interval(self, x, x_point, se, t_val, Sxx, mean_x, window_size):
-        margin = t_val * se * np.sqrt(
-            1 + 1 / window_size + ((x_point - mean_x) ** 2) / Sxx
-        )
-        return margin
-
     def detect_breaks(
         self,
         df: pd.DataFrame,
@@ -24,7 +122,7 @@ class CTrendBreakDetector:
         - +1 : rupture haussière
         - -1 : rupture baissière
         - 0  : aucun signal
-        - np.nan : fenêtre non clean
+        - np.nan : fenêtre non clean (ou plate : résidus nuls, IC dégénéré)
 
         Args:
             df (pd.DataFrame): DataFrame avec colonnes 'high' et 'low'.
@@ -34,62 +132,61 @@ class CTrendBreakDetector:
 
         Returns:
             pd.DataFrame: copie du DataFrame avec la colonne ajoutée.
+
+        Régression glissante vectorisée (sommes cumulées par blocs), test des fenêtres sur
+        sliding_window_view : mêmes signaux que la régression point par point (à l'arrondi
+        flottant près sur les cas limites).
+        """
+        df_result = df.copy()
+        df_result[signal_col_name] = self.compute_signals(df, window, alpha)
+        return df_result
+
+    def compute_signals(self, df, window=20, alpha=0.05):
+        """Tableau des signaux (float : 1, -1, 0, NaN) de `detect_breaks`, sans copie du DataFrame."""
+        highs = df["high"].to_numpy(dtype=float)
+        lows = df["low"].to_numpy(dtype=float)
+        t_val = stats.t.ppf(1 - alpha / 2, df=window - 2)
+        return grid_signals(highs, lows, 0, len(df), [(window, t_val)])[0]
+
+    def detect_breaks_grid(self, df, grid, col_format="break_signal_{window}_{alpha}", n_workers=None):
         """
-        highs = df["high"].values
-        lows = df["low"].values
-        avg_price = (highs + lows) / 2
+        Signaux de `detect_breaks` pour toute une grille de paramètres, en une passe sur les données.
+
+        Args:
+            df (pd.DataFrame): DataFrame avec colonnes 'high' et 'low' (non copié).
+            grid (list): couples (window, alpha), ou triplets (window, alpha, signal_col_name).
+            col_format (str): nom des colonnes pour les couples sans nom.
+            n_workers (int): nombre de processus (défaut : os.cpu_count()). Le pool n'est utilisé
+                que si bougies x taille de la grille dépasse PARALLEL_MIN_ELEMENTS ; chaque
+                processus traite une tranche de bougies pour toute la grille.
+
+        Returns:
+            pd.DataFrame: une colonne de signaux par élément de la grille, même index que df.
+        """
+        names, params = [], []
+        for item in grid:
+            window, alpha = item[0], item[1]
+            names.append(item[2] if len(item) > 2 else col_format.format(window=window, alpha=alpha))
+            params.append((window, stats.t.ppf(1 - alpha / 2, df=window - 2)))
+
+        highs = df["high"].to_numpy(dtype=float)
+        lows = df["low"].to_numpy(dtype=float)
         n = len(df)
+        n_workers = n_workers or os.cpu_count() or 1
 
-        results = [np.nan] * n  # Initialisé à nan par défaut
-
-        for i in range(window, n):
-            x_window = np.arange(i - window, i)
-            y_window = avg_price[i - window:i]
-
-            # Régression linéaire
-            slope, intercept, _, _, _ = stats.linregress(x_window, y_window)
-            y_fit = intercept + slope * x_window
-            residuals = y_window - y_fit
-            se = np.std(residuals, ddof=2)
-
-            t_val = stats.t.ppf(1 - alpha / 2, df=window - 2)
-            mean_x = np.mean(x_window)
-            Sxx = np.sum((x_window - mean_x) ** 2)
-
-            # Vérifier que tous les points de la fenêtre sont dans leur IC prédictif
-            clean_window = True
-            for j in range(window):
-                xj = x_window[j]
-                y_pred_j = intercept + slope * xj
-                margin_j = self._compute_prediction_interval(
-                    x_window, xj, se, t_val, Sxx, mean_x, window
-                )
-                lower_j = y_pred_j - margin_j
-                upper_j = y_pred_j + margin_j
-                if y_window[j] < lower_j or y_window[j] > upper_j:
-                    clean_window = False
-                    break
-
-            if not clean_window:
-                results[i] = np.nan
-                continue
-
-            # Tester la dernière bougie
-            x_i = i
-            y_pred_i = intercept + slope * x_i
-            margin_i = self._compute_prediction_interval(
-                x_window, x_i, se, t_val, Sxx, mean_x, window
-            )
-            lower_i = y_pred_i - margin_i
-            upper_i = y_pred_i + margin_i
-
-            if highs[i] > upper_i:
-                results[i] = 1
-            elif lows[i] < lower_i:
-                results[i] = -1
-            else:
-                results[i] = 0
+        if n_workers > 1 and n * len(params) >= PARALLEL_MIN_ELEMENTS:
+            # Tranches contiguës de bougies, chacune avec les max(window) bougies qui la précèdent
+            max_window = max(window for window, _ in params)
+            bounds = np.linspace(0, n, n_workers + 1).astype(int)
+            tasks = []
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                lo = max(0, start - max_window)
+                tasks.append({"highs": highs[lo:stop], "lows": lows[lo:stop],
+                              "start": start - lo, "stop": stop - lo, "grid": params})
+            # map() conserve l'ordre des tranches
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = np.concatenate(list(executor.map(_grid_shard, tasks)), axis=1)
+        else:
+            results = grid_signals(highs, lows, 0, n, params)
 
-        df_result = df.copy()
-        df_result[signal_col_name] = results
-        return df_result
+        return pd.DataFrame(dict(zip(names, results)), index=df.index)
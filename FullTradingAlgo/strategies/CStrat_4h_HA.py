@@ -4,38 +4,47 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import CRSICalculator
+import CMultiRSICalculator
 import CTransformToPanda
+from CBarCursor import CBarCursor
 import CIndicatorsBTCAdder
 import CJapanesePatternDetector
+from CRollingOHLC import CRollingOHLC
+from CIndicatorCache import CIndicatorCache
 
 class CStrat_4h_HA:
-    def __init__(self, interface_trade=None, risk_per_trade_pct: float = 0.1, stop_loss_ratio: float = 0.98):
+    def __init__(self, interface_trade=None, risk_per_trade_pct: float = 0.1, stop_loss_ratio: float = 0.98,
+                 indicator_cache: CIndicatorCache = None):
         self.interface_trade = interface_trade
         self.risk_per_trade_pct = risk_per_trade_pct
         self.stop_loss_ratio = stop_loss_ratio
         self.transformer =CTransformToPanda.CTransformToPanda(raw_dir="../raw", panda_dir="../panda")
+        self.indicator_cache = indicator_cache  # cache disque des indicateurs (None = pas de cache)
 
-    def apply(self, df, symbol, row, timestamp, open_positions):
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked=False, i=None, cursor=None):
         actions = []
 
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         if i < 240 * 4:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
-        current_close = df["close_4h_HA"].iloc[i]
-        past = [df["close_4h_HA"].iloc[i - 240 * j] for j in range(1, 5)]
+        close_4h_ha = cursor.column("close_4h_HA")
+        current_close = close_4h_ha[i]
+        past = [close_4h_ha[i - 240 * j] for j in range(1, 5)]
         rsi_4h = row["rsi_4h_14"]
 
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        open_pos = open_positions.get(symbol)
         can_reverse = True
         if open_pos:
-            minutes_open = (timestamp - open_pos["opened_on"]).total_seconds() / 60
+            minutes_open = (timestamp - open_pos.opened_on).total_seconds() / 60
             if minutes_open < 240:
                 can_reverse = False
 
         if can_reverse and open_pos:
-            if open_pos["side"] == "SHORT" and current_close > past[0]:
+            if open_pos.side == "SHORT" and current_close > past[0]:
                 actions.append({
                     "action": "CLOSE",
                     "symbol": symbol,
@@ -44,7 +53,7 @@ class CStrat_4h_HA:
                     "reason": "REVERSAL_HA",
                     "position": open_pos
                 })
-            elif open_pos["side"] == "LONG" and current_close < past[0]:
+            elif open_pos.side == "LONG" and current_close < past[0]:
                 actions.append({
                     "action": "CLOSE",
                     "symbol": symbol,
@@ -82,26 +91,19 @@ class CStrat_4h_HA:
         return actions
 
     def apply_indicators(self, df, is_btc_file):
-        df = df.copy()
-
         if not isinstance(df.index, pd.DatetimeIndex):
             raise ValueError("Le DataFrame doit avoir un index temporel (datetime).")
 
-        df = CRSICalculator.CRSICalculator(df, period=14,
-                                           close_times=[(3, 59), (7, 59), (11, 59), (15, 59), (19, 59), (23, 59)],
-                                           name="rsi_4h_14").get_df()
-
-        close_times_1h = [(h, 59) for h in range(24)]
-        df = CRSICalculator.CRSICalculator(df, period=14, close_times=close_times_1h, name="rsi_1h_14").get_df()
+        # RSI 4h (clôtures 03:59, 07:59, ...) et 1h (clôtures hh:59) en une passe, une seule copie du df
+        specs = [("4h", 14, "rsi_4h_14"), ("1h", 14, "rsi_1h_14")]
+        if self.indicator_cache is not None:
+            df = self.indicator_cache.apply(df, CMultiRSICalculator.CMultiRSICalculator, inputs=["close"],
+                                            specs=specs, close_at="end")
+        else:
+            df = CMultiRSICalculator.CMultiRSICalculator(df, specs, close_at="end").get_df()
         df = df.drop(columns=[col for col in df.columns if "avg_" in col])
 
-        window = 240  # 4h = 240 minutes
-        open_4h = df['open'].rolling(window=window).apply(lambda x: x.iloc[0], raw=False)
-        high_4h = df['high'].rolling(window=window).max()
-        low_4h = df['low'].rolling(window=window).min()
-        close_4h = df['close'].rolling(window=window).apply(lambda x: x.iloc[-1], raw=False)
-
-        df['close_4h_HA'] = (open_4h + high_4h + low_4h + close_4h) / 4
+        df['close_4h_HA'] = CRollingOHLC.heikin_ashi_close(df, window=240)  # 4h = 240 minutes
 
         detector = CJapanesePatternDetector.CJapanesePatternDetector(
             pattern_name="CDLMORNINGSTAR",
@@ -109,7 +111,15 @@ class CStrat_4h_HA:
             pct_threshold=0.3,
             output_col_name="jap_hammer_5m"
         )
-        df = detector.detect_and_filter(df)
+        if self.indicator_cache is not None:
+            df = self.indicator_cache.get_or_compute(
+                df, CJapanesePatternDetector.CJapanesePatternDetector,
+                {"pattern_name": detector.pattern_name, "timeframe": detector.timeframe,
+                 "pct_threshold": detector.pct_threshold, "output_col_name": detector.output_col_name},
+                lambda d: detector.detect_and_filter(d.copy()),
+                inputs=["open", "high", "low", "close", "volume"])
+        else:
+            df = detector.detect_and_filter(df)
 
         if not is_btc_file:
             adder = CIndicatorsBTCAdder.CIndicatorsBTCAdder(btc_dir="../panda")
@@ -121,5 +131,5 @@ class CStrat_4h_HA:
         self.transformer.process_all(self.apply_indicators)
 
 if __name__ == "__main__":
-    strat = CStrat_4h_HA()
+    strat = CStrat_4h_HA(indicator_cache=CIndicatorCache("../cache/indicators"))
     strat.run()
\ No newline at end of file
@@ -6,6 +6,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import CRSICalculator
 import CTransformToPanda
+from CBarCursor import CBarCursor
 import CIndicatorsBTCAdder
 import CJapanesePatternDetector
 
@@ -16,17 +17,20 @@ class CStrat_PatternsJDU:
         self.stop_loss_ratio = stop_loss_ratio
         self.transformer =CTransformToPanda.CTransformToPanda(raw_dir="../raw", panda_dir="../panda")
 
-    def apply(self, df, symbol, row, timestamp, open_positions):
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked=False, i=None, cursor=None):
         actions = []
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         x = 50
         if i < x:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
         current_rsi = row["rsi_4h_14"]
-        rsi_window = df["rsi_4h_14"].iloc[i - x:i]
+        rsi_window = cursor.column("rsi_4h_14")[i - x:i]
 
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        open_pos = open_positions.get(symbol)
 
         if open_pos:
             # aucune logique de clôture automatique
@@ -1,22 +1,27 @@
 import pandas as pd
 
+from CBarCursor import CBarCursor
+
 class CStrat_RSI30:
     def __init__(self, interface_trade, risk_per_trade_pct: float = 0.1, stop_loss_ratio: float = 0.98):
         self.interface_trade = interface_trade
         self.risk_per_trade_pct = risk_per_trade_pct
         self.stop_loss_ratio = stop_loss_ratio
 
-    def apply(self, df, symbol, row, timestamp, open_positions):
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked=False, i=None, cursor=None):
         actions = []
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         x = 50
         if i < x:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
         current_rsi = row["rsi_4h_14"]
-        rsi_window = df["rsi_4h_14"].iloc[i - x:i]
+        rsi_window = cursor.column("rsi_4h_14")[i - x:i]
 
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        open_pos = open_positions.get(symbol)
 
         if open_pos:
             # aucune logique de clôture automatique
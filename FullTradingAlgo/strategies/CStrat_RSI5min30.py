@@ -6,10 +6,15 @@ from enum import Enum, auto
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../indicators")))
 
-import CRSICalculator
+import CMultiRSICalculator
+from CStreamingRSI import CStreamingRSI
 import CTransformToPanda
 import CPeaksDetector
 import CIndicatorsBTCAdder
+from CBarCursor import CBarCursor
+from CRunningExtrema import CSlidingExtremum, CRunningMaxThenMin
+from CEventLog import CEventLog
+from CIndicatorCache import CIndicatorCache
 
 
 class StratState(Enum):
@@ -24,14 +29,23 @@ class StratState(Enum):
 class CStrat_RSI5min30:
     def __init__(self, interface_trade=None, risk_per_trade_pct: float = 0.1,
                  stop_loss_ratio: float = 0.98, max_bars_in_trade: int = 288,
-                 break_max_timeout_bars: int = 24):
+                 break_max_timeout_bars: int = 24, rsi5m_low: float = 30,
+                 rsi5m_take_profit: float = 60, pullback_ratio: float = 0.985,
+                 event_log: CEventLog = None, indicator_cache: CIndicatorCache = None):
         self.interface_trade = interface_trade
         self.risk_per_trade_pct = risk_per_trade_pct
         self.stop_loss_ratio = stop_loss_ratio
         self.max_bars_in_trade = max_bars_in_trade
         self.break_max_timeout_bars = break_max_timeout_bars  # 24 bougies 5m = 2h
+        self.rsi5m_low = rsi5m_low                  # RSI 5m sous ce seuil -> début de setup
+        self.rsi5m_take_profit = rsi5m_take_profit  # RSI 5m au-dessus -> prise de profit
+        self.pullback_ratio = pullback_ratio        # repli minimal après le max (0.985 = -1.5 %)
         self.transformer = CTransformToPanda.CTransformToPanda(raw_dir="../raw", panda_dir="../panda")
         self.state = {}  # symbol → dict état
+        self.low_trackers = {}  # symbol → min glissant des 30 derniers "low" (stop-loss)
+        self.event_log = event_log if event_log is not None else CEventLog()
+        self._timestamp = None  # bougie en cours, pour horodater les évènements
+        self.indicator_cache = indicator_cache  # cache disque des indicateurs (None = pas de cache)
 
     def _init_symbol_state(self, symbol):
         if symbol not in self.state:
@@ -41,49 +55,68 @@ class CStrat_RSI5min30:
                 "rebound_max_price": None,
                 "wait_start_index": None,
                 "entry_index": None,
-                "break_max_start_index": None
+                "break_max_start_index": None,
+                "after_max": None  # CRunningMaxThenMin des closes depuis wait_start_index
             }
 
-    def _reset_symbol_state(self, symbol, new_state=StratState.WAIT_RSI5M_LOW):
+    def _reset_symbol_state(self, symbol, new_state=StratState.WAIT_RSI5M_LOW, reason="RESET"):
         """Réinitialise complètement l'état du symbole et définit l'état initial."""
         old_state = self.state[symbol]["state"] if symbol in self.state else None
-        print(f"[TRACE] {symbol}: RESET state {old_state} -> {new_state}")
+        self.event_log.log(self._timestamp, symbol, old_state.name if old_state else None,
+                           new_state.name, reason)
         self.state[symbol] = {
             "state": new_state,
             "rsi5m_min": None,
             "rebound_max_price": None,
             "wait_start_index": None,
             "entry_index": None,
-            "break_max_start_index": None
+            "break_max_start_index": None,
+            "after_max": None
         }
 
-    def _set_state(self, symbol, new_state):
-        """Change d’état avec trace systématique"""
+    def _stop_loss_price(self, symbol, cursor, i):
+        """Plus bas "low" des 30 bougies précédentes, tenu à jour incrémentalement."""
+        tracker = self.low_trackers.get(symbol)
+        if tracker is None:
+            tracker = self.low_trackers[symbol] = CSlidingExtremum(30, "min")
+        return tracker.advance_to(cursor.column("low"), i)
+
+    def _set_state(self, symbol, new_state, reason=""):
+        """Change d’état, chaque transition est enregistrée dans le journal d'évènements"""
         old_state = self.state[symbol]["state"]
         if old_state != new_state:
-            print(f"[TRACE] {symbol}: STATE {old_state.name} -> {new_state.name}")
+            self.event_log.log(self._timestamp, symbol, old_state.name, new_state.name, reason)
         self.state[symbol]["state"] = new_state
 
-    def apply(self, df, symbol, row, timestamp, open_positions, blocked):
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked, i=None, cursor=None):
+        """
+        `i` est la position de la bougie dans `df` et `cursor` un CBarCursor sur ce df,
+        fournis par le moteur ; ils ne sont recalculés que si `apply` est appelée seule.
+        """
         actions = []
+        self._timestamp = timestamp
         self._init_symbol_state(symbol)
         state = self.state[symbol]
 
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         if i < 240:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
         close = row["close__b_P1"]
         rsi5m = row.get("rsi_5m_14_P2", None)
         rsi4h = row.get("rsi_4h_14_P2", None)
-        rsi4h_prev1 = df["rsi_4h_14_P2"].iloc[i - 10]
-        rsi4h_prev2 = df["rsi_4h_14_P2"].iloc[i - 240]
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        rsi4h_col = cursor.column("rsi_4h_14_P2")
+        rsi4h_prev1 = rsi4h_col[i - 10]
+        rsi4h_prev2 = rsi4h_col[i - 240]
+        open_pos = open_positions.get(symbol)
 
         # =================== MACHINE À ÉTATS ===================
         # 1️⃣ WAIT_RSI5M_LOW
         if state["state"] == StratState.WAIT_RSI5M_LOW:
-            if rsi5m is not None and rsi5m < 30:
+            if rsi5m is not None and rsi5m < self.rsi5m_low:
                 state["rsi5m_min"] = rsi5m
                 if rsi4h_prev1 >= rsi4h_prev2 + 1:
                     self._set_state(symbol, StratState.WAIT_REBOUND_UP)
@@ -100,7 +133,7 @@ class CStrat_RSI5min30:
                         self._set_state(symbol, StratState.WAIT_RSI5M_LOW)
                         return actions
 
-                    sl_price = df.iloc[i - 30:i]["low"].min()
+                    sl_price = self._stop_loss_price(symbol, cursor, i)
                     usdc = self.interface_trade.get_available_usdc() * self.risk_per_trade_pct
                     actions.append({
                         "action": "OPEN",
@@ -123,16 +156,18 @@ class CStrat_RSI5min30:
                     self._set_state(symbol, StratState.WAIT_AFTER_MAX)
                     state["wait_start_index"] = i
                     state["rebound_max_price"] = close
+                    state["after_max"] = CRunningMaxThenMin()
+                    state["after_max"].update(close)
 
         # 4️⃣ WAIT_AFTER_MAX
         elif state["state"] == StratState.WAIT_AFTER_MAX:
-            df_window = df.iloc[state["wait_start_index"]:i + 1]
-            max_idx = df_window["close__b_P1"].idxmax()
-            max_close = df_window.loc[max_idx, "close__b_P1"]
-            df_after_max = df_window.loc[max_idx:]
-            min_close = df_after_max["close__b_P1"].min()
+            # Max des closes depuis wait_start_index et min depuis ce max, mis à jour en O(1)
+            after_max = state["after_max"]
+            after_max.update(close)
+            max_close = after_max.max
+            min_close = after_max.min_after_max
 
-            if min_close <= max_close * 0.985:
+            if min_close <= max_close * self.pullback_ratio:
                 self._set_state(symbol, StratState.WAIT_BREAK_MAX)
                 state["break_max_start_index"] = i  # ⏳ on démarre le timer pour 2h
                 actions.append({
@@ -145,12 +180,13 @@ class CStrat_RSI5min30:
                     "entry_index": i
                 })
             elif i - state["wait_start_index"] >= 60:
-                self._set_state(symbol, StratState.WAIT_RSI5M_LOW)
+                self._set_state(symbol, StratState.WAIT_RSI5M_LOW, "TIMEOUT_WAIT_AFTER_MAX")
                 state["rsi5m_min"] = None
                 state["rebound_max_price"] = None
                 state["wait_start_index"] = None
                 state["entry_index"] = None
                 state["break_max_start_index"] = None
+                state["after_max"] = None
             else:
                 state["rebound_max_price"] = max(state.get("rebound_max_price", 0), max_close)
 
@@ -159,10 +195,10 @@ class CStrat_RSI5min30:
             if close > state["rebound_max_price"]:
 
                 if blocked:
-                    self._set_state(symbol, StratState.WAIT_RSI5M_LOW)
+                    self._set_state(symbol, StratState.WAIT_RSI5M_LOW, "BLOCKED")
                     return actions
 
-                sl_price = df.iloc[i - 30:i]["low"].min()
+                sl_price = self._stop_loss_price(symbol, cursor, i)
                 usdc = self.interface_trade.get_available_usdc() * self.risk_per_trade_pct
                 actions.append({
                     "action": "OPEN",
@@ -179,8 +215,7 @@ class CStrat_RSI5min30:
 
             elif state.get("break_max_start_index") is not None and \
                  (i - state["break_max_start_index"]) >= self.break_max_timeout_bars:
-                print(f"[TRACE] {symbol}: Timeout WAIT_BREAK_MAX -> RESET (2h sans breakout)")
-                self._set_state(symbol, StratState.WAIT_RSI5M_LOW)
+                self._set_state(symbol, StratState.WAIT_RSI5M_LOW, "TIMEOUT_WAIT_BREAK_MAX")
                 state["rsi5m_min"] = None
                 state["rebound_max_price"] = None
                 state["wait_start_index"] = None
@@ -189,7 +224,7 @@ class CStrat_RSI5min30:
 
         # 6️⃣ TRADE_OPEN
         elif state["state"] == StratState.TRADE_OPEN and open_pos is not None:
-            sl_price = open_pos.get("sl")
+            sl_price = open_pos.sl
             if sl_price and close <= sl_price:
                 actions.append({
                     "action": "CLOSE",
@@ -197,46 +232,44 @@ class CStrat_RSI5min30:
                     "side": "LONG",
                     "price": close,
                     "exit_price": close,
-                    "usdc": open_pos.get("usdc", 0),
+                    "usdc": open_pos.usdc,
                     "exit_side": "SELL_LONG",
                     "reason": "STOP_LOSS",
                     "position": open_pos
                 })
-                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW)
+                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW, "STOP_LOSS")
 
-            elif rsi5m and rsi5m >= 60:
+            elif rsi5m and rsi5m >= self.rsi5m_take_profit:
                 actions.append({
                     "action": "CLOSE",
                     "symbol": symbol,
                     "side": "LONG",
                     "price": close,
                     "exit_price": close,
-                    "usdc": open_pos.get("usdc", 0),
+                    "usdc": open_pos.usdc,
                     "exit_side": "SELL_LONG",
                     "reason": "TP_TOTAL",
                     "position": open_pos
                 })
-                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW)
+                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW, "TP_TOTAL")
 
-            elif "entry_index" in open_pos and (i - open_pos["entry_index"]) >= self.max_bars_in_trade:
+            elif open_pos.entry_index is not None and (i - open_pos.entry_index) >= self.max_bars_in_trade:
                 actions.append({
                     "action": "CLOSE",
                     "symbol": symbol,
                     "side": "LONG",
                     "price": close,
                     "exit_price": close,
-                    "usdc": open_pos.get("usdc", 0),
+                    "usdc": open_pos.usdc,
                     "exit_side": "SELL_LONG",
                     "reason": "TIME_BASED_EXIT",
                     "position": open_pos
                 })
-                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW)
+                self._reset_symbol_state(symbol, StratState.WAIT_RSI5M_LOW, "TIME_BASED_EXIT")
 
         return actions
 
     def apply_indicators(self, df, is_btc_file):
-        df = df.copy()
-
         # ⚡ Nettoyage de l’index pour éviter les doublons et trier chronologiquement
         df = df[~df.index.duplicated(keep='last')]
         df = df.sort_index()
@@ -251,18 +284,13 @@ class CStrat_RSI5min30:
                               col.startswith("rsi_5m_14")]
         df = df.drop(columns=rsi_cols_to_remove, errors=True)
 
-        # RSI 4h
-        df = CRSICalculator.CRSICalculator(
-            df, period=14,
-            close_times=[(h, m) for h in range(0, 24, 4) for m in [0]],
-            name="rsi_4h_14"
-        ).get_df()
-
-        # RSI 5m
-        close_times_5m = [(h, m) for h in range(24) for m in range(0, 60, 5)]
-        df = CRSICalculator.CRSICalculator(
-            df, period=14, close_times=close_times_5m, name="rsi_5m_14"
-        ).get_df()
+        # RSI 4h (clôtures à 00:00, 04:00, ...) et 5m (minutes multiples de 5) en une passe
+        specs = [("4h", 14, "rsi_4h_14"), ("5min", 14, "rsi_5m_14")]
+        if self.indicator_cache is not None:
+            df = self.indicator_cache.apply(df, CMultiRSICalculator.CMultiRSICalculator, inputs=["close"],
+                                            specs=specs)
+        else:
+            df = CMultiRSICalculator.CMultiRSICalculator(df, specs).get_df()
 
         # df = CPeaksDetector.CPeaksDetector(df, atr_period=1000, factor=0.7, distance=30,
         #          max_col="peak_max_v_m_P1", min_col="peak_min_^_y_P1").get_df()
@@ -276,9 +304,52 @@ class CStrat_RSI5min30:
 
         return df
 
+    def init_indicator_streams(self, df):
+        """
+        Production : RSI incrémentaux équivalents à `apply_indicators`, amorcés sur l'historique
+        `df` (bougies 1m). Retourne {colonne: CStreamingRSI}.
+        """
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        return {
+            "rsi_4h_14_P2": CStreamingRSI(period=14, rule="4h", name="rsi_4h_14").seed(df),
+            "rsi_5m_14_P2": CStreamingRSI(period=14, rule="5min", name="rsi_5m_14").seed(df),
+        }
+
+    def update_indicators(self, df, streams, since):
+        """
+        Renseigne les indicateurs des bougies de `df` postérieures à `since` (nouvelles bougies
+        de la minute) en O(1) par bougie, au lieu de relancer `apply_indicators` sur tout le df.
+        """
+        new_rows = df.index > since
+        if not new_rows.any():
+            return df
+        timestamps = df.index[new_rows]
+        closes = df["close"].to_numpy(dtype=float)[new_rows]
+        for col, stream in streams.items():
+            df.loc[new_rows, col] = [stream.update(ts, close) for ts, close in zip(timestamps, closes)]
+        df.loc[new_rows, "close__b_P1"] = closes
+        return df
+
     def run(self):
         self.transformer.process_all(self.apply_indicators)
 
+    def get_state(self, symbol):
+        """État courant du symbole (None tant que `apply` ne l'a pas initialisé)."""
+        st = self.state.get(symbol)
+        return st["state"] if st is not None else None
+
+    def get_wakeup_masks(self, symbol, cursor):
+        """
+        Masques vectorisés {état: tableau booléen} des bougies où `apply` peut agir dans cet état.
+        Dans WAIT_RSI5M_LOW rien ne se passe tant que le RSI 5m n'est pas sous `rsi5m_low` :
+        le moteur peut sauter directement à la prochaine bougie du masque.
+        Les états absents du dictionnaire sont évalués à chaque bougie.
+        """
+        rsi5m = cursor.column("rsi_5m_14_P2")
+        if rsi5m is None:
+            return {}
+        return {StratState.WAIT_RSI5M_LOW: rsi5m < self.rsi5m_low}
+
     def get_symbol_states(self):
         """
         Retourne un dictionnaire {symbole: état courant}.
@@ -287,5 +358,5 @@ class CStrat_RSI5min30:
         return {sym: st["state"].name for sym, st in self.state.items()}
 
 if __name__ == "__main__":
-    strat = CStrat_RSI5min30()
+    strat = CStrat_RSI5min30(indicator_cache=CIndicatorCache("../cache/indicators"))
     strat.run()
@@ -9,6 +9,14 @@ import CRSICalculator
 import CTransformToPanda
 import CIndicatorsBTCAdder
 import numpy as np
+from CBarCursor import CBarCursor
+from CRunningExtrema import CSlidingExtremum
+
+
+def _index_times(index):
+    """datetime64 de l'index, en UTC sans fuseau si l'index est tz-aware (to_numpy donnerait des objets)."""
+    return (index.tz_convert(None) if index.tz is not None else index).to_numpy()
+
 
 class CStrat_RSI5min30:
     def __init__(self, interface_trade=None, risk_per_trade_pct: float = 0.1, stop_loss_ratio: float = 0.98):
@@ -22,15 +30,23 @@ class CStrat_RSI5min30:
         self._last_close_timestamp = {}         # datetime fermeture TP/SL par symbole
         self._last_open_timestamp = {}          # datetime ouverture position par symbole
 
-    def apply(self, df, symbol, row, timestamp, open_positions):
+        # Min glissants (symbole, colonne) pour les stop-loss, et max du "high" entre
+        # fermeture et ouverture précédentes, calculé une fois par couple de timestamps
+        self._window_mins = {}
+        self._reentry_max_high = {}
+
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked=False, i=None, cursor=None):
         actions = []
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         window_size = 15  # minutes pour stop loss
 
         if i < window_size or i < 2:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        open_pos = open_positions.get(symbol)
         close = row["close"]
         current_rsi_5m = row.get("rsi_5m_14", None)
 
@@ -49,9 +65,7 @@ class CStrat_RSI5min30:
                 # Calcul max prix entre fermeture et ouverture précédentes (fenêtre prix)
                 max_price_since_close = None
                 if last_close_ts is not None and last_open_ts is not None:
-                    price_window = df.loc[last_close_ts:last_open_ts]
-                    if not price_window.empty:
-                        max_price_since_close = price_window["high"].max()
+                    max_price_since_close = self._max_high_between(df, symbol, last_close_ts, last_open_ts)
 
                 # Calcul delta RSI 5 min (actuel vs 10 min avant)
                 delta_rsi_pct = None
@@ -70,8 +84,7 @@ class CStrat_RSI5min30:
 
                 if can_open:
                     montant_trade = self.interface_trade.get_available_usdc() * self.risk_per_trade_pct
-                    stop_loss_window = df.iloc[max(0, i - window_size):i]
-                    sl_price = self.stop_loss_ratio * stop_loss_window["low"].min()
+                    sl_price = self.stop_loss_ratio * self._window_min(symbol, cursor, "low", i, window_size)
 
                     actions.append({
                         "action": "OPEN",
@@ -93,8 +106,7 @@ class CStrat_RSI5min30:
             # Ouverture LONG classique si signal RSI
             if not pd.isna(row.get("rsi_5_remonte_*_g_P1", np.nan)):
                 montant_trade = self.interface_trade.get_available_usdc() * self.risk_per_trade_pct
-                stop_loss_window = df.iloc[i - window_size:i]
-                sl_price = stop_loss_window["moy_l_h_e_c__c_P1"].min()
+                sl_price = self._window_min(symbol, cursor, "moy_l_h_e_c__c_P1", i, window_size)
 
                 actions.append({
                     "action": "OPEN",
@@ -109,8 +121,8 @@ class CStrat_RSI5min30:
             return actions
 
         # --- CAS AVEC POSITION LONG OUVERTE ---
-        if open_pos["side"] == "LONG":
-            sl_price = open_pos.get("sl", None)
+        if open_pos.side == "LONG":
+            sl_price = open_pos.sl
 
             # Fermeture au stop loss
             if sl_price is not None and close <= sl_price:
@@ -120,7 +132,7 @@ class CStrat_RSI5min30:
                     "side": "LONG",
                     "price": close,
                     "exit_price": close,
-                    "usdc": open_pos.get("usdc", 0),
+                    "usdc": open_pos.usdc,
                     "exit_side": "SELL_LONG",
                     "reason": "STOP_LOSS",
                     "position": open_pos
@@ -138,7 +150,7 @@ class CStrat_RSI5min30:
                     "side": "LONG",
                     "price": close,
                     "exit_price": close,
-                    "usdc": open_pos.get("usdc", 0),
+                    "usdc": open_pos.usdc,
                     "exit_side": "SELL_LONG",
                     "reason": "REVERSAL_HA",
                     "position": open_pos
@@ -150,63 +162,90 @@ class CStrat_RSI5min30:
 
         return actions
 
+    def _window_min(self, symbol, cursor, col, i, window):
+        """Min de col sur les `window` bougies précédant i, tenu à jour incrémentalement."""
+        tracker = self._window_mins.get((symbol, col))
+        if tracker is None:
+            tracker = self._window_mins[(symbol, col)] = CSlidingExtremum(window, "min")
+        return tracker.advance_to(cursor.column(col), i)
+
+    def _max_high_between(self, df, symbol, start_ts, end_ts):
+        """Max du "high" entre deux timestamps, mémorisé tant que le couple ne change pas."""
+        cached = self._reentry_max_high.get(symbol)
+        if cached is not None and cached[0] == start_ts and cached[1] == end_ts:
+            return cached[2]
+        price_window = df.loc[start_ts:end_ts]
+        value = price_window["high"].max() if not price_window.empty else None
+        self._reentry_max_high[symbol] = (start_ts, end_ts, value)
+        return value
+
     def detect_rsi_remonte_progressive(self, df, minutes=10, delta=3):
         col_cross = 'r_5m_cross_*_b_P1'  # Colonne avec les points de départ
         col_result = 'rsi_5_remonte_*_g_P1'  # Colonne résultat avec prix lors de la remontée
 
-        df[col_result] = np.nan
+        # Positions entières sur l'index trié (searchsorted), écritures dans un tableau
+        times = _index_times(df.index)
+        rsi = df['rsi_5m_14'].to_numpy(dtype=float)
+        price = df['moy_l_h_e_c__c_P1'].to_numpy(dtype=float)
+        result = np.full(len(df), np.nan)
+        step = np.timedelta64(minutes, 'm')
+        n = len(times)
 
-        # Récupérer les index des points initiaux
-        cross_points = df.index[df[col_cross].notna()]
+        # Positions des points initiaux
+        for start in np.flatnonzero(df[col_cross].notna().to_numpy()):
+            prev_rsi = rsi[start]
 
-        for start_time in cross_points:
-            prev_rsi = df.at[start_time, 'rsi_5m_14']
+            current_time = times[start] + step
+            pos = np.searchsorted(times, current_time)
 
-            current_time = start_time + pd.Timedelta(minutes=minutes)
-
-            while current_time in df.index:
-                current_rsi = df.at[current_time, 'rsi_5m_14']
+            # Tant que la bougie current_time existe
+            while pos < n and times[pos] == current_time:
+                current_rsi = rsi[pos]
 
                 # On compare le RSI actuel avec le RSI précédent
                 if current_rsi >= prev_rsi + delta:
                     # La remontée est détectée, on prend le prix à ce moment
-                    df.at[current_time, col_result] = df.at[current_time, 'moy_l_h_e_c__c_P1']
+                    result[pos] = price[pos]
                     break  # On arrête la boucle pour ce point initial
 
                 # Sinon, on continue avec ce RSI actuel comme référence pour la prochaine étape
                 prev_rsi = current_rsi
-                current_time += pd.Timedelta(minutes=minutes)
+                current_time += step
+                # Bougies régulières : la suivante est `minutes` positions plus loin
+                pos = pos + minutes if pos + minutes < n and times[pos + minutes] == current_time \
+                    else np.searchsorted(times, current_time)
 
+        df[col_result] = result
         return df
 
     def add_rsi_cross_verif(self, df, minutes=10, pas=2):
         col_init = 'r_5m_cross_*_b_P1'
         col_verif = 'r_5m_cross_verif_*_k_P1'
 
-        df[col_verif] = np.nan
+        times = _index_times(df.index)
+        rsi = df['rsi_5m_14'].to_numpy(dtype=float)
+        init = df[col_init].to_numpy(dtype=float)
+        verif = np.full(len(df), np.nan)
+        step = np.timedelta64(minutes, 'm')
 
-        points_idx = df.index[df[col_init].notna()]
+        # Pour chaque point : première bougie >= t + minutes (une recherche pour tous les points)
+        points = np.flatnonzero(~np.isnan(init))
+        future = np.searchsorted(times, times[points] + step)
+        has_future = future < len(times)
+        future_clipped = np.where(has_future, future, 0)
+        rsi_drop = has_future & (rsi[future_clipped] <= rsi[points] - pas)
 
         last_verif_time = None
 
-        for t in points_idx:
-            if last_verif_time is not None and (t - last_verif_time).total_seconds() < minutes * 60:
+        for k, t in enumerate(times[points]):
+            if last_verif_time is not None and t - last_verif_time < step:
                 continue
 
-            rsi_init = df.at[t, 'rsi_5m_14']
-            t_future = t + pd.Timedelta(minutes=minutes)
-
-            future_idx = df.index[df.index >= t_future]
-            if len(future_idx) == 0:
-                continue
-
-            idx_future = future_idx[0]
-            rsi_future = df.at[idx_future, 'rsi_5m_14']
-
-            if rsi_future <= rsi_init - pas:
-                df.at[idx_future, col_verif] = df.at[idx_future, col_init]
-                last_verif_time = t_future
+            if rsi_drop[k]:
+                verif[future[k]] = init[future[k]]
+                last_verif_time = t + step
 
+        df[col_verif] = verif
         return df
 
     def apply_indicators(self, df, is_btc_file):
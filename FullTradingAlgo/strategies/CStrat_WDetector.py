@@ -7,6 +7,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../indi
 
 import CRSICalculator
 import CTransformToPanda
+from CBarCursor import CBarCursor
 import CIndicatorsBTCAdder
 import CTrendBreakDetector
 import numpy as np
@@ -18,17 +19,20 @@ class CStrat_WDetector:
         self.stop_loss_ratio = stop_loss_ratio
         self.transformer =CTransformToPanda.CTransformToPanda(raw_dir="../raw", panda_dir="../panda")
 
-    def apply(self, df, symbol, row, timestamp, open_positions):
+    def apply(self, df, symbol, row, timestamp, open_positions, blocked=False, i=None, cursor=None):
         actions = []
-        i = df.index.get_loc(timestamp)
+        if i is None:
+            i = df.index.get_loc(timestamp)
         x = 50
         if i < x:
             return actions
+        if cursor is None:
+            cursor = CBarCursor(df, symbol)
 
         current_rsi = row["rsi_4h_14"]
-        rsi_window = df["rsi_4h_14"].iloc[i - x:i]
+        rsi_window = cursor.column("rsi_4h_14")[i - x:i]
 
-        open_pos = next((p for p in open_positions if p["symbol"] == symbol), None)
+        open_pos = open_positions.get(symbol)
 
         if open_pos:
             # aucune logique de clôture automatique
@@ -89,45 +93,36 @@ class CStrat_WDetector:
         if any(col not in df.columns for col in ["open", "close", "high", "low"]):
             raise ValueError("Le DataFrame doit contenir les colonnes 'open', 'close', 'high', 'low'.")
 
-        price_mean = df["moy_l_h_e_c"]
-
-        raw_signals = [0] * len(df)
-
-        for i in range(interval1 + interval2, len(df)):
-            start_price = price_mean.iloc[i - interval1 - interval2]
-            mid_price = price_mean.iloc[i - interval2]
-            drop = (mid_price - start_price) * 100 / start_price
-
-            if drop > drop_pct:
-                continue
-
-            end_price = price_mean.iloc[i]
-            rise = (end_price - mid_price) * 100 / mid_price
-
-            if rise >= rise_pct:
-                raw_signals[i - interval2] = 1
-
-        # Nettoyage avancé des signaux dans une fenêtre de 5 minutes
-        filtered_signals = [0] * len(df)
-
-        signal_df = df.copy()
-        signal_df["raw"] = raw_signals
-
-        signal_points = signal_df[signal_df["raw"] == 1]
-        used_indices = set()
-
-        for current_time, _ in signal_points.iterrows():
-            if current_time in used_indices:
-                continue
-
-            window_end = current_time + pd.Timedelta(minutes=interval2)
-            window_points = signal_points.loc[
-            (signal_points.index >= current_time) & (signal_points.index < window_end)]
-
-            if not window_points.empty:
-                min_low_idx = window_points["low"].idxmin()
-                filtered_signals[df.index.get_loc(min_low_idx)] = 1
-                used_indices.update(window_points.index)
+        price_mean = df["moy_l_h_e_c"].to_numpy(dtype=float)
+        n = len(df)
+
+        # Détections brutes, sur tableaux décalés : pour chaque point médian j,
+        # départ = j - interval1, fin = j + interval2 (signal placé au point médian)
+        raw_signals = np.zeros(n, dtype=bool)
+        if n > interval1 + interval2:
+            start_price = price_mean[:n - interval1 - interval2]
+            mid_price = price_mean[interval1:n - interval2]
+            end_price = price_mean[interval1 + interval2:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                drop = (mid_price - start_price) * 100 / start_price
+                rise = (end_price - mid_price) * 100 / mid_price
+            # ~(drop > drop_pct) et non (drop <= drop_pct) : une chute NaN n'élimine pas le point
+            raw_signals[interval1:n - interval2] = ~(drop > drop_pct) & (rise >= rise_pct)
+
+        # Nettoyage avancé des signaux dans une fenêtre de `interval2` minutes : le premier point
+        # non traité ouvre un groupe [t, t + interval2[, on garde le point de low minimal du groupe
+        filtered_signals = np.zeros(n, dtype=np.int64)
+
+        signal_positions = np.flatnonzero(raw_signals)
+        signal_times = df.index[signal_positions]
+        group_ends = signal_times.searchsorted(signal_times + pd.Timedelta(minutes=interval2), side="left")
+        lows = df["low"].to_numpy(dtype=float)[signal_positions]
+
+        k = 0
+        while k < len(signal_positions):
+            end = group_ends[k]
+            filtered_signals[signal_positions[k + np.nanargmin(lows[k:end])]] = 1
+            k = end
 
         df[column_name] = filtered_signals
         # # Nettoyage des détections consécutives
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from CCustomCandlePatterns import CCustomCandlePatterns
+
+
+def reference_morning_star(df):
+    """Boucle d'origine (_detect_custom_morning_star de CJapanesePatternDetector)."""
+    result = pd.Series(0, index=df.index)
+    for i in range(2, len(df)):
+        o1, c1 = df.iloc[i-2]["open"], df.iloc[i-2]["close"]
+        o2, c2 = df.iloc[i-1]["open"], df.iloc[i-1]["close"]
+        o3, c3 = df.iloc[i]["open"], df.iloc[i]["close"]
+        if c1 >= o1:
+            continue
+        body2 = abs(c2 - o2)
+        range2 = df.iloc[i-1]["high"] - df.iloc[i-1]["low"]
+        if range2 == 0 or body2 / range2 > 0.3:
+            continue
+        if c3 <= o3:
+            continue
+        midpoint_b1 = o1 - abs(o1 - c1) / 2
+        if c3 < midpoint_b1:
+            continue
+        result.iloc[i] = 1
+    return result
+
+
+def integer_candles(n=3000, seed=0):
+    """Petits entiers : beaucoup d'égalités (corps nuls, range nul, close sur le milieu de B1)."""
+    rng = np.random.default_rng(seed)
+    o = rng.integers(0, 6, n).astype(float)
+    c = rng.integers(0, 6, n).astype(float)
+    return pd.DataFrame({"open": o, "close": c,
+                         "high": np.maximum(o, c) + rng.integers(0, 3, n),
+                         "low": np.minimum(o, c) - rng.integers(0, 3, n)})
+
+
+def frame(bodies):
+    """Bougies (open, close), mèches de 0.5 de chaque côté."""
+    o, c = np.array(bodies, dtype=float).T
+    return pd.DataFrame({"open": o, "close": c,
+                         "high": np.maximum(o, c) + 0.5, "low": np.minimum(o, c) - 0.5})
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_morning_star_matches_reference_loop(seed):
+    df = integer_candles(seed=seed)
+    expected = reference_morning_star(df).to_numpy()
+    assert expected.sum() > 20
+    np.testing.assert_array_equal(CCustomCandlePatterns.morning_star(df), expected)
+
+
+def test_morning_star_never_fires_on_nan_candles():
+    df = integer_candles()
+    df.iloc[np.random.default_rng(5).choice(len(df), 150, replace=False), 1] = np.nan
+    signal = CCustomCandlePatterns.morning_star(df)
+    has_nan = df["close"].isna().rolling(3, min_periods=1).max().to_numpy().astype(bool)
+
+    assert not signal[has_nan].any()
+    # Hors des fenêtres avec NaN, même résultat que la boucle d'origine
+    np.testing.assert_array_equal(signal[~has_nan], reference_morning_star(df).to_numpy()[~has_nan])
+
+
+def test_evening_star():
+    assert list(CCustomCandlePatterns.evening_star(frame([(10, 14), (14, 14.2), (14, 11)]))) == [0, 0, -1]
+    # Troisième bougie au-dessus du milieu du corps de B1 (12)
+    assert list(CCustomCandlePatterns.evening_star(frame([(10, 14), (14, 14.2), (14, 13)]))) == [0, 0, 0]
+    # Deuxième bougie à grand corps
+    assert list(CCustomCandlePatterns.evening_star(frame([(10, 14), (14, 16), (16, 11)]))) == [0, 0, 0]
+
+
+def test_engulfing():
+    assert list(CCustomCandlePatterns.engulfing(frame([(12, 10), (9.5, 12.5)]))) == [0, 1]
+    assert list(CCustomCandlePatterns.engulfing(frame([(10, 12), (12.5, 9.5)]))) == [0, -1]
+    # Corps de la deuxième bougie à l'intérieur du premier
+    assert list(CCustomCandlePatterns.engulfing(frame([(12, 10), (10.5, 11.5)]))) == [0, 0]
+
+
+def test_three_soldiers_crows():
+    assert list(CCustomCandlePatterns.three_soldiers_crows(frame([(10, 11), (10.5, 12), (11.5, 13)]))) == [0, 0, 1]
+    assert list(CCustomCandlePatterns.three_soldiers_crows(frame([(13, 12), (12.5, 11), (11.5, 10)]))) == [0, 0, -1]
+    # Troisième ouverture au-dessus du corps précédent (gap)
+    assert list(CCustomCandlePatterns.three_soldiers_crows(frame([(10, 11), (10.5, 12), (12.5, 13.5)]))) == [0, 0, 0]
+    # Closes non croissants
+    assert list(CCustomCandlePatterns.three_soldiers_crows(frame([(10, 12), (10.5, 11.5), (11, 11.8)]))) == [0, 0, 0]
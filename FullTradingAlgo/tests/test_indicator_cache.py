@@ -0,0 +1,46 @@
+import CMultiRSICalculator
+import CRSICalculator
+from CIndicatorCache import CIndicatorCache
+from CSyntheticCandles import CSyntheticCandles
+
+SPECS = [("4h", 14, "rsi_4h_14"), ("5min", 14, "rsi_5m_14")]
+
+
+def test_hit_returns_same_columns(tmp_path):
+    cache = CIndicatorCache(str(tmp_path))
+    df = CSyntheticCandles(seed=3).generate(4 * 1440)
+    expected = CMultiRSICalculator.CMultiRSICalculator(df, SPECS).get_df()
+
+    miss = cache.apply(df, CMultiRSICalculator.CMultiRSICalculator, inputs=["close"], specs=SPECS)
+    hit = cache.apply(df, CMultiRSICalculator.CMultiRSICalculator, inputs=["close"], specs=SPECS)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert miss.equals(expected) and hit.equals(expected)
+
+
+def test_key_ignores_unread_columns_but_not_inputs(tmp_path):
+    cache = CIndicatorCache(str(tmp_path))
+    df = CSyntheticCandles(seed=3).generate(1440)
+    key = cache.make_key(df, CMultiRSICalculator.CMultiRSICalculator, {"specs": SPECS}, inputs=["close"])
+
+    with_extra = df.assign(other_indicator=1.0)
+    assert cache.make_key(with_extra, CMultiRSICalculator.CMultiRSICalculator, {"specs": SPECS},
+                          inputs=["close"]) == key
+
+    changed = df.copy()
+    changed.iloc[10, changed.columns.get_loc("close")] += 1
+    assert cache.make_key(changed, CMultiRSICalculator.CMultiRSICalculator, {"specs": SPECS},
+                          inputs=["close"]) != key
+
+
+def test_indicator_key_covers_project_dependencies():
+    modules = CIndicatorCache._project_dependencies(CMultiRSICalculator)
+    assert CRSICalculator in modules  # interpolate_rsi, close_rule_step
+    assert all(module.__name__ not in ("numpy", "pandas") for module in modules)
+
+
+def test_eviction_by_entries(tmp_path):
+    cache = CIndicatorCache(str(tmp_path), max_entries=1)
+    df = CSyntheticCandles(seed=3).generate(1440)
+    cache.apply(df, CRSICalculator.CRSICalculator, inputs=["close"], rule="1h", name="r1")
+    cache.apply(df, CRSICalculator.CRSICalculator, inputs=["close"], rule="4h", name="r4")
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
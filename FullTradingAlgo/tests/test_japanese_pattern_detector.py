@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from CCustomCandlePatterns import CUSTOM_PATTERNS
+from CJapanesePatternDetector import CJapanesePatternDetector, bucket_positions, inject, resample_ohlcv
+from CMultiPatternDetector import CMultiPatternDetector
+from CSyntheticCandles import CSyntheticCandles
+
+
+def reference_detect_and_filter(df, pattern_name, timeframe, pct_threshold, output_col_name, signal_fn):
+    """detect_and_filter d'origine : filtre par iterrows, injection par df.loc[ts:ts_end]."""
+    pct_threshold = pct_threshold / 100.0
+    df_resampled = df.resample(timeframe).agg({
+        "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"
+    }).dropna()
+    signal_col = f"{pattern_name.lower()}_signal"
+    df_resampled[signal_col] = signal_fn(df_resampled)
+
+    df_resampled["filtered"] = 0
+    for idx, row in df_resampled.iterrows():
+        signal = row[signal_col]
+        if signal == 1:
+            if row["low"] > 0 and (row["close"] - row["low"]) / row["low"] >= pct_threshold:
+                df_resampled.at[idx, "filtered"] = 1
+        elif signal == -1:
+            if row["close"] > 0 and (row["high"] - row["close"]) / row["close"] >= pct_threshold:
+                df_resampled.at[idx, "filtered"] = -1
+
+    df[output_col_name] = 0
+    for ts, signal in df_resampled["filtered"].items():
+        ts_end = ts + pd.Timedelta(seconds=pd.Timedelta(timeframe).total_seconds() - 60)
+        df.loc[ts:ts_end, output_col_name] = signal
+    return df
+
+
+def gapped_candles(n=4000, seed=2):
+    """Bougies 1 minute avec des périodes agrégées entières manquantes, des minutes isolées et des NaN."""
+    df = CSyntheticCandles(seed=seed, volatility=0.01).generate(n)
+    rng = np.random.default_rng(seed)
+    df.iloc[rng.choice(n, 10, replace=False), df.columns.get_loc("close")] = np.nan
+    drop = (rng.random(n) < 0.05) | ((np.arange(n) >= 1000) & (np.arange(n) < 1047))
+    return df[~drop]
+
+
+@pytest.mark.parametrize("pattern_name", ["CDLMORNINGSTAR", "CUSTOM_ENGULFING"])
+@pytest.mark.parametrize("timeframe", ["5min", "15min"])
+@pytest.mark.parametrize("pct_threshold", [0.0, 0.3])
+def test_detect_and_filter_matches_reference_loop(pattern_name, timeframe, pct_threshold):
+    df = gapped_candles()
+    expected = reference_detect_and_filter(df.copy(), pattern_name, timeframe, pct_threshold, "jap",
+                                           CUSTOM_PATTERNS[pattern_name])
+    result = CJapanesePatternDetector(pattern_name, timeframe=timeframe, pct_threshold=pct_threshold,
+                                      output_col_name="jap").detect_and_filter(df.copy())
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert (expected["jap"] != 0).any()
+
+
+def test_talib_pattern_matches_reference_loop():
+    talib = pytest.importorskip("talib")
+    df = gapped_candles()
+
+    def talib_signal(df_resampled):
+        values = talib.CDLENGULFING(df_resampled["open"], df_resampled["high"],
+                                    df_resampled["low"], df_resampled["close"])
+        return values.apply(lambda x: 1 if x > 0 else (-1 if x < 0 else 0))
+
+    expected = reference_detect_and_filter(df.copy(), "CDLENGULFING", "5min", 0.1, "jap", talib_signal)
+    result = CJapanesePatternDetector("CDLENGULFING", timeframe="5min", pct_threshold=0.1,
+                                      output_col_name="jap").detect_and_filter(df.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("timeframe", ["5min", "1h"])
+def test_bucket_injection_matches_loc_loop(timeframe):
+    df = gapped_candles()
+    # Heure entière de closes NaN : bougies fines présentes, bougies agrégées retirées par dropna
+    df.loc["2025-01-02 03:00":"2025-01-02 03:59", "close"] = np.nan
+    buckets = resample_ohlcv(df, timeframe).index
+    values = np.random.default_rng(0).integers(-1, 2, len(buckets))
+
+    expected = pd.Series(0, index=df.index)
+    for ts, value in zip(buckets, values):
+        ts_end = ts + pd.Timedelta(seconds=pd.Timedelta(timeframe).total_seconds() - 60)
+        expected.loc[ts:ts_end] = value
+
+    pos = bucket_positions(df.index, buckets, timeframe)
+    np.testing.assert_array_equal(inject(values, pos), expected.to_numpy())
+    assert (pos[df.index.get_indexer(df.loc["2025-01-02 03:00":"2025-01-02 03:59"].index)] == -1).all()
+
+
+def test_injection_without_buckets():
+    df = gapped_candles(n=100)
+    pos = bucket_positions(df.index, df.index[:0], "5min")
+    np.testing.assert_array_equal(inject(np.array([], dtype=np.int64), pos), np.zeros(len(df)))
+
+
+def test_multi_detector_matches_single_detectors():
+    specs = [("CDLMORNINGSTAR", "5min", 0.0, "ms_5m"), ("CUSTOM_ENGULFING", "5min", 0.3, "eng_5m"),
+             ("CUSTOM_EVENINGSTAR", "15min", 0.0, "es_15m"), ("CUSTOM_ENGULFING", "15min", 0.1, "eng_15m")]
+    df = gapped_candles()
+
+    expected = df.copy()
+    for pattern_name, timeframe, pct_threshold, col in specs:
+        expected = CJapanesePatternDetector(pattern_name, timeframe=timeframe, pct_threshold=pct_threshold,
+                                            output_col_name=col).detect_and_filter(expected)
+    result = CMultiPatternDetector(specs).detect_and_filter(df)
+
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from CMultiRSICalculator import CMultiRSICalculator
+from CRSICalculator import CRSICalculator
+from CSyntheticCandles import CSyntheticCandles
+
+
+def gapped_candles(seed=3):
+    """Bougies 1 minute avec un trou de plusieurs heures, des minutes manquantes et des closes NaN."""
+    df = CSyntheticCandles(seed=seed).generate(6 * 1440)
+    rng = np.random.default_rng(seed)
+    df.iloc[rng.choice(len(df), 30, replace=False), df.columns.get_loc("close")] = np.nan
+    drop = (rng.random(len(df)) < 0.02) | ((np.arange(len(df)) >= 2000) & (np.arange(len(df)) < 2300))
+    return df[~drop]
+
+
+def test_single_pass_equals_separate_calculators():
+    df = gapped_candles()
+    expected = CRSICalculator(df, period=14, rule="4h", name="rsi_4h_14").get_df()
+    expected = CRSICalculator(expected, period=14, rule="5min", name="rsi_5m_14").get_df()
+
+    result = CMultiRSICalculator(df, [("4h", 14, "rsi_4h_14"), ("5min", 14, "rsi_5m_14")]).get_df()
+
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected)
+    assert result["rsi_4h_14"].notna().sum() > len(df) // 2
+
+
+@pytest.mark.parametrize("close_at", ["start", "end"])
+def test_close_times_and_close_at_specs(close_at):
+    df = gapped_candles(seed=4)
+    closes_1h = [(h, 30) for h in range(24)]
+    expected = CRSICalculator(df, period=6, rule="4h", close_at=close_at, name="r4").get_df()
+    expected = CRSICalculator(expected, period=9, close_times=closes_1h, name="r1").get_df()
+
+    result = CMultiRSICalculator(df, [("4h", 6, "r4"), (closes_1h, 9, "r1")], close_at=close_at).get_df()
+
+    pd.testing.assert_frame_equal(result, expected)
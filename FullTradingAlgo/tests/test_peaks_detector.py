@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+
+from CPeaksDetector import CPeaksDetector, select_by_peak_distance
+from CSyntheticCandles import CSyntheticCandles
+
+
+def rounded_candles():
+    df = CSyntheticCandles(seed=7).generate(5 * 1440)
+    # Prix arrondis : plateaux et pics de même hauteur (égalités dans la sélection par distance)
+    df["high"] = df["high"].round(1)
+    df["low"] = df["low"].round(1)
+    return df
+
+
+@pytest.mark.parametrize("distance", [1, 5, 30])
+def test_select_by_peak_distance_matches_find_peaks(distance):
+    values = rounded_candles()["high"].to_numpy()
+    peaks = find_peaks(values)[0]
+    expected = find_peaks(values, distance=distance)[0]
+    np.testing.assert_array_equal(peaks[select_by_peak_distance(peaks, values[peaks], distance)], expected)
+
+
+@pytest.mark.parametrize("distance", [5, 30])
+def test_chunked_mode_matches_one_piece(distance):
+    df = rounded_candles()
+    one_piece = CPeaksDetector(df, atr_period=14, factor=0.5, distance=distance, wlen=2000).get_df()
+    chunked = CPeaksDetector(df, atr_period=14, factor=0.5, distance=distance, wlen=2000,
+                             chunk_size=1000).get_df()
+    assert one_piece.equals(chunked)
+
+
+def test_chunked_mode_requires_wlen():
+    with pytest.raises(ValueError):
+        CPeaksDetector(rounded_candles(), chunk_size=1000)
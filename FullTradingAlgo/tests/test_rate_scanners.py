@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.CStrat_RSI5min30_rate import CStrat_RSI5min30
+
+COL_CROSS = 'r_5m_cross_*_b_P1'
+
+
+def reference_remonte_progressive(df, minutes=10, delta=3):
+    """Boucle d'origine de detect_rsi_remonte_progressive (df.at / `in df.index`)."""
+    col_result = 'rsi_5_remonte_*_g_P1'
+    df[col_result] = np.nan
+    for start_time in df.index[df[COL_CROSS].notna()]:
+        prev_rsi = df.at[start_time, 'rsi_5m_14']
+        current_time = start_time + pd.Timedelta(minutes=minutes)
+        while current_time in df.index:
+            current_rsi = df.at[current_time, 'rsi_5m_14']
+            if current_rsi >= prev_rsi + delta:
+                df.at[current_time, col_result] = df.at[current_time, 'moy_l_h_e_c__c_P1']
+                break
+            prev_rsi = current_rsi
+            current_time += pd.Timedelta(minutes=minutes)
+    return df
+
+
+def reference_cross_verif(df, minutes=10, pas=2):
+    """Boucle d'origine de add_rsi_cross_verif (recherche de la bougie future par masque)."""
+    col_verif = 'r_5m_cross_verif_*_k_P1'
+    df[col_verif] = np.nan
+    last_verif_time = None
+    for t in df.index[df[COL_CROSS].notna()]:
+        if last_verif_time is not None and (t - last_verif_time).total_seconds() < minutes * 60:
+            continue
+        rsi_init = df.at[t, 'rsi_5m_14']
+        future_idx = df.index[df.index >= t + pd.Timedelta(minutes=minutes)]
+        if len(future_idx) == 0:
+            continue
+        idx_future = future_idx[0]
+        if df.at[idx_future, 'rsi_5m_14'] <= rsi_init - pas:
+            df.at[idx_future, col_verif] = df.at[idx_future, COL_CROSS]
+            last_verif_time = t + pd.Timedelta(minutes=minutes)
+    return df
+
+
+def gapped_frame(tz=None, n=6000, seed=0):
+    """Bougies 1 minute avec trous (minutes isolées et une plage d'une heure), points de départ fréquents."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-01-01", periods=n, freq="1min", tz=tz)
+    df = pd.DataFrame({
+        "rsi_5m_14": np.clip(50 + np.cumsum(rng.normal(scale=1.5, size=n)), 0, 100),
+        "moy_l_h_e_c__c_P1": 100 + np.cumsum(rng.normal(scale=0.1, size=n)),
+        COL_CROSS: np.where(rng.random(n) < 0.3, rng.normal(100, 1, size=n), np.nan),
+    }, index=index)
+    df.iloc[rng.choice(n, 20, replace=False), 0] = np.nan
+    keep = (rng.random(n) > 0.08) & ~((np.arange(n) >= 3000) & (np.arange(n) < 3060))
+    return df[keep]
+
+
+@pytest.fixture
+def strategy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # CTransformToPanda crée ../panda
+    return CStrat_RSI5min30()
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "Europe/Paris"])
+def test_scanners_match_reference_loops(strategy, tz):
+    df = gapped_frame(tz)
+
+    expected = reference_cross_verif(reference_remonte_progressive(df.copy()))
+    result = strategy.add_rsi_cross_verif(strategy.detect_rsi_remonte_progressive(df.copy()))
+
+    pd.testing.assert_frame_equal(result, expected)
+    # Le jeu de données doit produire des détections pour les deux scanners
+    assert expected['rsi_5_remonte_*_g_P1'].notna().sum() > 10
+    assert expected['r_5m_cross_verif_*_k_P1'].notna().sum() > 10
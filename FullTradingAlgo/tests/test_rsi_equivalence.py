@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from CRSICalculator import CRSICalculator
+
+CLOSES_4H_END = [(3, 59), (7, 59), (11, 59), (15, 59), (19, 59), (23, 59)]
+CLOSES_4H_START = [(h, 0) for h in range(0, 24, 4)]
+CLOSES_5MIN = [(h, m) for h in range(24) for m in range(0, 60, 5)]
+
+
+def reference_rsi(df, period, close_times, name="rsi"):
+    """RSI de la version d'origine : points par apply, puis interpolation minute par minute en boucle."""
+    df = df.copy()
+    alpha = 1 / period
+
+    df_close = df[[(x.hour, x.minute) in close_times for x in df.index]].copy()
+    df_close['delta'] = df_close['close'].diff()
+    df_close['gain'] = df_close['delta'].apply(lambda x: max(x, 0))
+    df_close['loss'] = df_close['delta'].apply(lambda x: max(-x, 0))
+    df_close[f'avg_gain_{name}'] = df_close['gain'].ewm(alpha=alpha, min_periods=period).mean()
+    df_close[f'avg_loss_{name}'] = df_close['loss'].ewm(alpha=alpha, min_periods=period).mean()
+
+    def compute_rsi(gain, loss):
+        if loss == 0:
+            return 100
+        return 100 - (100 / (1 + gain / loss))
+
+    df_close[name] = df_close.apply(lambda row: compute_rsi(row[f'avg_gain_{name}'], row[f'avg_loss_{name}']), axis=1)
+    df = df.merge(df_close[[f'avg_gain_{name}', f'avg_loss_{name}', name]],
+                  how='left', left_index=True, right_index=True)
+
+    rsi_filled = []
+    last_gain = last_loss = last_price = None
+    for idx in df.index:
+        gain = df.at[idx, f'avg_gain_{name}']
+        loss = df.at[idx, f'avg_loss_{name}']
+        if pd.notna(gain) and pd.notna(loss):
+            last_gain, last_loss, last_price = gain, loss, df.at[idx, 'close']
+            rsi = df.at[idx, name]
+        elif last_gain is not None:
+            delta = df.at[idx, 'close'] - last_price
+            gain_avg = (1 - alpha) * last_gain + alpha * max(delta, 0)
+            loss_avg = (1 - alpha) * last_loss + alpha * max(-delta, 0)
+            rsi = 100 - (100 / (1 + gain_avg / loss_avg)) if loss_avg != 0 else 100
+        else:
+            rsi = None
+        rsi_filled.append(rsi)
+
+    df[name] = rsi_filled
+    return df
+
+
+def make_minutes(days=6, seed=0):
+    """Bougies 1 minute avec trous (heures entières et minutes de clôture manquantes) et closes NaN."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-01-01", periods=days * 24 * 60, freq="1min")
+    close = 100 + np.cumsum(rng.normal(scale=0.2, size=len(index)))
+    df = pd.DataFrame({"close": close}, index=index)
+
+    # Closes NaN : en cours de période et sur des points de clôture
+    df.loc[df.index[rng.choice(len(df), 40, replace=False)], "close"] = np.nan
+    for ts in ("2025-01-01 11:59", "2025-01-02 08:00", "2025-01-02 10:35", "2025-01-02 15:59"):
+        df.loc[pd.Timestamp(ts), "close"] = np.nan
+    # Début montant : perte moyenne nulle (RSI à 100) sur les premiers points 5 minutes
+    df.loc[:"2025-01-01 01:00", "close"] = np.linspace(98, 100, 61)
+
+    # Trous : une plage de plusieurs heures, des minutes de clôture et des minutes isolées
+    gaps = (((df.index >= "2025-01-02 17:03") & (df.index < "2025-01-02 21:30"))
+            | df.index.isin(pd.to_datetime(["2025-01-01 19:59", "2025-01-03 04:00", "2025-01-03 12:10"]))
+            | (rng.random(len(df)) < 0.01))
+    return df[~gaps]
+
+
+@pytest.mark.parametrize("period", [3, 14])
+@pytest.mark.parametrize("close_times,rule,close_at", [
+    (CLOSES_4H_END, None, "start"),
+    (CLOSES_4H_START, None, "start"),
+    (CLOSES_5MIN, None, "start"),
+    (CLOSES_4H_END, "4h", "end"),
+    (CLOSES_4H_START, "4h", "start"),
+    (CLOSES_5MIN, "5min", "start"),
+])
+def test_rsi_matches_reference_loop(period, close_times, rule, close_at):
+    df = make_minutes()
+    expected = reference_rsi(df, period, close_times)
+    if rule is None:
+        result = CRSICalculator(df, period=period, close_times=close_times).get_df()
+    else:
+        result = CRSICalculator(df, period=period, rule=rule, close_at=close_at).get_df()
+
+    assert list(result.columns) == list(expected.columns)
+    assert result.index.equals(expected.index)
+    for col in expected.columns:
+        np.testing.assert_allclose(result[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                                   rtol=1e-12, atol=1e-12, equal_nan=True, err_msg=col)
+    # Le test doit couvrir des NaN (début de série, closes NaN) et surtout des valeurs définies
+    rsi = result["rsi"].to_numpy(dtype=float)
+    assert np.isnan(rsi).any() and (~np.isnan(rsi)).sum() > len(rsi) // 3
+
+
+def test_rsi_without_losses_is_100():
+    df = make_minutes()
+    rsi = CRSICalculator(df, period=3, rule="5min").get_df()["rsi"]
+    rising = rsi.loc["2025-01-01 00:15":"2025-01-01 01:00"].dropna()
+    assert len(rising) > 30 and (rising == 100).all()
@@ -0,0 +1,26 @@
+import numpy as np
+
+from CRunningExtrema import CSlidingExtremum
+
+
+def test_advance_to_matches_nanmin():
+    values = np.random.default_rng(0).normal(size=500)
+    values[100:110] = np.nan
+    tracker = CSlidingExtremum(30, "min")
+    for end in range(30, 500, 3):
+        assert tracker.advance_to(values, end) == np.nanmin(values[end - 30:end])
+
+
+def test_advance_to_resets_on_new_array_or_rewind():
+    rng = np.random.default_rng(1)
+    first, second = rng.normal(size=300), rng.normal(size=300)
+    tracker = CSlidingExtremum(30, "max")
+    tracker.advance_to(first, 250)
+
+    # Autre tableau de même longueur (nouveau run) : pas de reprise de l'ancien état
+    assert tracker.advance_to(second, 260) == np.nanmax(second[230:260])
+    # Retour en arrière sur le même tableau
+    assert tracker.advance_to(second, 50) == np.nanmax(second[20:50])
+    # Tableau qui a grandi (fenêtre glissante de production)
+    longer = np.concatenate([second, rng.normal(size=10)])
+    assert tracker.advance_to(longer, 305) == np.nanmax(longer[275:305])
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from CEventLog import CEventLog, WARNING
+from CSharedMarketData import CSharedMarketData
+from CSyntheticCandles import CSyntheticCandles
+
+
+def test_publish_logs_skipped_columns_and_attach_round_trips(capsys):
+    df = CSyntheticCandles(seed=1).generate(500).tz_localize("UTC")
+    df["symbol"] = "SYNUSDC"
+    event_log = CEventLog()
+
+    shared = CSharedMarketData(event_log=event_log).publish([(df, "SYNUSDC")])
+    try:
+        list_data, segments = CSharedMarketData.attach(shared.get_meta())
+        (attached, symbol), = list_data
+        assert symbol == "SYNUSDC"
+        pd.testing.assert_frame_equal(attached, df.drop(columns=["symbol"]), check_freq=False,
+                                      check_names=False)
+        del attached, list_data
+        for shm in segments:
+            shm.close()
+    finally:
+        shared.release()
+
+    # Avertissement dans le journal, rien d'affiché
+    assert event_log.count(WARNING) == 1
+    assert "symbol" in event_log.to_dataframe()["reason"].iloc[0]
+    assert capsys.readouterr().out == ""
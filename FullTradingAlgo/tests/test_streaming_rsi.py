@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from CStreamingRSI import CStreamingRSI
+from CSyntheticCandles import CSyntheticCandles
+from strategies.CStrat_RSI5min30 import CStrat_RSI5min30
+
+COLUMNS = ["rsi_4h_14_P2", "rsi_5m_14_P2", "close__b_P1"]
+
+
+@pytest.fixture
+def strategy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # CTransformToPanda crée ../panda
+    return CStrat_RSI5min30()
+
+
+def test_streams_match_apply_indicators_across_gap(strategy):
+    """Comme S_Prod : amorçage sur l'historique, puis nouvelles bougies après un trou de 300 minutes."""
+    candles = CSyntheticCandles(seed=7).generate(6000)
+    history = candles.iloc[:4000]
+    live = pd.concat([history, candles.iloc[4300:]])
+
+    streams = strategy.init_indicator_streams(history)
+    previous = strategy.apply_indicators(history, is_btc_file=False)
+    updated = live.join(previous.drop(columns=live.columns))
+    updated = strategy.update_indicators(updated, streams, since=previous.index[-1])
+
+    expected = strategy.apply_indicators(live, is_btc_file=False)
+    for col in COLUMNS:
+        np.testing.assert_allclose(updated[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                                   rtol=1e-12, atol=1e-12, equal_nan=True, err_msg=col)
+    assert expected["rsi_4h_14_P2"].iloc[4000:].notna().all()
+
+
+def test_update_rejects_non_increasing_timestamps():
+    candles = CSyntheticCandles(seed=7).generate(100)
+    stream = CStreamingRSI(period=14, rule="5min").seed(candles)
+    last = candles.index[-1]
+    with pytest.raises(ValueError):
+        stream.update(last, 1.0)
+    with pytest.raises(ValueError):
+        stream.update(last - pd.Timedelta(minutes=1), 1.0)
+
+
+@pytest.mark.parametrize("disorder", ["unsorted", "duplicated"])
+def test_seed_rejects_non_increasing_timestamps(disorder):
+    candles = CSyntheticCandles(seed=7).generate(100)
+    if disorder == "unsorted":
+        candles = candles.iloc[[*range(50), 60, *range(50, 60), *range(61, 100)]]
+    else:
+        candles = pd.concat([candles.iloc[:50], candles.iloc[49:]])
+    with pytest.raises(ValueError):
+        CStreamingRSI(period=14, rule="5min").seed(candles)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+import CTrendBreakDetector
+from CSyntheticCandles import CSyntheticCandles
+
+
+def reference_breaks(df, window, alpha):
+    """Boucle d'origine (linregress bougie par bougie), référence des signaux."""
+    highs = df["high"].values
+    lows = df["low"].values
+    avg_price = (highs + lows) / 2
+    results = np.full(len(df), np.nan)
+    t_val = stats.t.ppf(1 - alpha / 2, df=window - 2)
+    for i in range(window, len(df)):
+        x = np.arange(i - window, i)
+        y = avg_price[i - window:i]
+        slope, intercept, _, _, _ = stats.linregress(x, y)
+        se = np.std(y - (intercept + slope * x), ddof=2)
+        mean_x = np.mean(x)
+        Sxx = np.sum((x - mean_x) ** 2)
+
+        def interval(xp):
+            margin = t_val * se * np.sqrt(1 + 1 / window + ((xp - mean_x) ** 2) / Sxx)
+            return intercept + slope * xp - margin, intercept + slope * xp + margin
+
+        lower, upper = interval(x)
+        if ((y < lower) | (y > upper)).any():
+            continue
+        lower_i, upper_i = interval(i)
+        results[i] = 1 if highs[i] > upper_i else (-1 if lows[i] < lower_i else 0)
+    return results
+
+
+def make_candles(price):
+    df = CSyntheticCandles(seed=11).generate(1500)
+    df[["open", "high", "low", "close"]] *= price / df["close"].iloc[0]
+    # Segment plat (toutes les bougies au même prix) et bougies NaN
+    for col in ["open", "high", "low", "close"]:
+        df.iloc[600:700, df.columns.get_loc(col)] = price
+    df.iloc[1000:1003, df.columns.get_loc("high")] = np.nan
+    return df
+
+
+def flat_windows(df, window):
+    avg_price = ((df["high"] + df["low"]) / 2).to_numpy()
+    return np.array([i >= window and np.nanmax(avg_price[i - window:i]) == np.nanmin(avg_price[i - window:i])
+                     for i in range(len(df))])
+
+
+@pytest.mark.parametrize("price", [1.2345, 0.1, 100.0, 30000.5])
+@pytest.mark.parametrize("window,alpha", [(20, 0.05), (5, 0.2), (30, 0.0001)])
+def test_detect_breaks_matches_loop(price, window, alpha):
+    df = make_candles(price)
+    expected = reference_breaks(df, window, alpha)
+    result = CTrendBreakDetector.CTrendBreakDetector().detect_breaks(df, window, alpha, "s")["s"].to_numpy()
+
+    # Fenêtres plates : toujours NaN (la boucle y dépend des arrondis)
+    flat = flat_windows(df, window)
+    assert flat.any()
+    assert np.isnan(result[flat]).all()
+    np.testing.assert_array_equal(result[~flat], expected[~flat])
+
+
+def test_grid_matches_single_runs():
+    df = make_candles(1.2345)
+    detector = CTrendBreakDetector.CTrendBreakDetector()
+    grid = [(20, 0.05), (5, 0.2, "named"), (30, 0.0001)]
+    signals = detector.detect_breaks_grid(df, grid, n_workers=1)
+    assert list(signals.columns) == ["break_signal_20_0.05", "named", "break_signal_30_0.0001"]
+    for item, col in zip(grid, signals.columns):
+        np.testing.assert_array_equal(signals[col].to_numpy(), detector.compute_signals(df, item[0], item[1]))
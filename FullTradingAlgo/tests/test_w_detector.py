@@ -0,0 +1,73 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.CStrat_WDetector import CStrat_WDetector
+
+
+def reference_w_pattern(df, interval1, drop_pct, rise_pct, interval2, column_name):
+    """Boucle d'origine de detect_w_pattern. Retourne aussi le nombre de détections brutes."""
+    price_mean = df["moy_l_h_e_c"]
+    raw_signals = [0] * len(df)
+    for i in range(interval1 + interval2, len(df)):
+        start_price = price_mean.iloc[i - interval1 - interval2]
+        mid_price = price_mean.iloc[i - interval2]
+        drop = (mid_price - start_price) * 100 / start_price
+        if drop > drop_pct:
+            continue
+        end_price = price_mean.iloc[i]
+        rise = (end_price - mid_price) * 100 / mid_price
+        if rise >= rise_pct:
+            raw_signals[i - interval2] = 1
+
+    filtered_signals = [0] * len(df)
+    signal_df = df.copy()
+    signal_df["raw"] = raw_signals
+    signal_points = signal_df[signal_df["raw"] == 1]
+    used_indices = set()
+    for current_time, _ in signal_points.iterrows():
+        if current_time in used_indices:
+            continue
+        window_end = current_time + pd.Timedelta(minutes=interval2)
+        window_points = signal_points.loc[
+            (signal_points.index >= current_time) & (signal_points.index < window_end)]
+        if not window_points.empty:
+            min_low_idx = window_points["low"].idxmin()
+            filtered_signals[df.index.get_loc(min_low_idx)] = 1
+            used_indices.update(window_points.index)
+
+    df[column_name] = filtered_signals
+    return df, sum(raw_signals)
+
+
+def w_frame(n=3000, seed=0):
+    """Bougies 1 minute avec trous, prix moyen oscillant (chutes et remontées), quelques NaN."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-01-01", periods=n, freq="1min")
+    mean = 100 * np.exp(np.cumsum(rng.normal(scale=0.003, size=n)) + 0.02 * np.sin(np.arange(n) / 15))
+    df = pd.DataFrame({"open": mean, "close": mean,
+                       "high": mean * (1 + rng.random(n) / 500), "low": mean * (1 - rng.random(n) / 500),
+                       "moy_l_h_e_c": mean}, index=index)
+    df.iloc[rng.choice(n, 15, replace=False), df.columns.get_loc("moy_l_h_e_c")] = np.nan
+    df.iloc[rng.choice(n, 15, replace=False), df.columns.get_loc("low")] = np.nan
+    return df[rng.random(n) > 0.05]
+
+
+@pytest.fixture
+def strategy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # CTransformToPanda crée ../panda
+    return CStrat_WDetector()
+
+
+@pytest.mark.parametrize("interval1,interval2,drop_pct,rise_pct",
+                         list(itertools.product([5, 20], [3, 10], [-0.3, -1.0], [0.2, 0.6])))
+def test_w_pattern_matches_reference_loop(strategy, interval1, interval2, drop_pct, rise_pct):
+    df = w_frame()
+    expected, raw_count = reference_w_pattern(df.copy(), interval1, drop_pct, rise_pct, interval2, "w")
+    result = strategy.detect_w_pattern(df.copy(), interval1, drop_pct, rise_pct, interval2, 1.0, "w")
+
+    assert (result["w"].to_numpy() == expected["w"].to_numpy()).all()
+    # Détections consécutives regroupées : le choix du low minimal du groupe est bien exercé
+    assert raw_count > expected["w"].sum() > 0